@@ -3,6 +3,7 @@
 from build123d import *
 from bd_warehouse.thread import IsoThread
 
+from lib.threads import cached_thread
 from vitamins.cue_joint_protector_female import build, get_section_dia, Dome, ALIGN
 
 
@@ -32,7 +33,8 @@ thread_maj_dia += brick_layers_comp
 lead_in_dia += brick_layers_comp
 
 
-_female_thread = IsoThread(
+_female_thread = cached_thread(
+    IsoThread,
     major_diameter=thread_maj_dia + thread_tol,
     pitch=thread_pitch,
     external=False,
@@ -3,6 +3,7 @@
 from build123d import *
 from bd_warehouse.thread import IsoThread
 
+from lib.threads import cached_thread
 from vitamins.cue_joint_protector_male import build
 
 outer_dia = 20.8
@@ -16,7 +17,8 @@ thread_tol = 0.1
 thread_inset = 4
 
 
-_male_thread = IsoThread(
+_male_thread = cached_thread(
+    IsoThread,
     major_diameter=thread_maj_dia - thread_tol,
     pitch=thread_pitch,
     external=True,
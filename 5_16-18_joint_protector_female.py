@@ -16,6 +16,7 @@ Print Setting Recommendations:
 from build123d import *
 from bd_warehouse.thread import IsoThread
 
+from lib.threads import cached_thread
 from vitamins.cue_joint_protector_female import build, get_section_dia, Dome
 from vitamins.cue_joint_protector_blank import ALIGN
 
@@ -35,7 +36,8 @@ brick_layers_comp = 0.6
 
 
 thread_maj_dia += brick_layers_comp
-_female_thread = IsoThread(
+_female_thread = cached_thread(
+    IsoThread,
     major_diameter=thread_maj_dia + thread_tol,
     pitch=thread_pitch,
     external=False,
@@ -25,6 +25,7 @@ Print Setting Recommendations:
 from build123d import *
 from bd_warehouse.thread import IsoThread
 
+from lib.threads import cached_thread
 from vitamins.cue_joint_protector_male import build
 
 outer_dia = 21.15
@@ -36,7 +37,8 @@ thread_length = 10
 thread_tol = 0.1
 
 
-_male_thread = IsoThread(
+_male_thread = cached_thread(
+    IsoThread,
     major_diameter=thread_maj_dia - thread_tol,
     pitch=thread_pitch,
     external=True,
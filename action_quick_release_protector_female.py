@@ -3,6 +3,7 @@
 from build123d import *
 from bd_warehouse.thread import Thread
 
+from lib.threads import cached_thread
 from vitamins.cue_joint_protector_female import build, get_section_dia, Dome
 from vitamins.cue_joint_protector_blank import ALIGN
 
@@ -43,7 +44,8 @@ lead_in_dia += brick_layers_comp
 
 shoulder = Cylinder(shoulder_dia / 2, shoulder_length, align=ALIGN)
 
-_female_thread = Thread(
+_female_thread = cached_thread(
+    Thread,
     apex_radius=thread_min_dia / 2 + thread_tol,
     apex_width=thread_tip_width,
     root_radius=thread_maj_dia / 2 + thread_tol,
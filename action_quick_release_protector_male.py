@@ -3,6 +3,7 @@
 from build123d import *
 from bd_warehouse.thread import Thread
 
+from lib.threads import cached_thread
 from vitamins.cue_joint_protector_male import build
 
 
@@ -24,7 +25,8 @@ thread_length = 8
 thread_tol = 0.1
 
 
-_male_thread = Thread(
+_male_thread = cached_thread(
+    Thread,
     apex_radius=thread_maj_dia / 2 - thread_tol,
     apex_width=thread_tip_width,
     root_radius=thread_min_dia / 2 - thread_tol,
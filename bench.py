@@ -0,0 +1,151 @@
+"""Export benchmarks for a fixed set of representative modules
+
+Every repetition builds and exports a module in a fresh process, the median
+build and export times are compared against a stored baseline. Unless --warm
+is given, each run also starts with empty STEP import and memo caches, so
+results don't depend on what was exported before.
+"""
+
+import json
+import multiprocessing
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+import click
+
+from export import mesh_profiles
+
+bench_files = [
+    "nfc_pedestal.py",
+    "catan_number_tiles.py",
+    "prusa_mk3_lcd_cover.py",
+    "cpu_holder.py",
+    "5_16-18_joint_protector_female.py",
+]
+
+
+def _run(module, path, mesh_profile, cold):
+    """Build and export a module, returning (build, export) wall times"""
+    import export
+    from exporter import timing
+    from lib import memo, step_cache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export.export_dir = Path(tmp) / "export"
+        if cold:
+            memo.cache_dir = Path(tmp) / "memo"
+            step_cache.cache_dir = Path(tmp) / "step"
+        names, _, timings = export._list_results(module, path, mesh_profile)
+        timings += export._export_results(module, path, names, mesh_profile)[1]
+    build = sum(t["wall"] for t in timings if t["phase"] in timing.build_phases)
+    return build, sum(t["wall"] for t in timings) - build
+
+
+def _compare(current, baseline, threshold):
+    """Print a comparison table and return the names of regressed modules"""
+    regressions = []
+    width = max(len(m) for m in current)
+    print(
+        f"{'Module':<{width}}  {'Build (s)':>9}  {'Change':>9}  "
+        f"{'Export (s)':>10}  {'Change':>9}"
+    )
+    for module, times in current.items():
+        base = baseline.get(module, {})
+        row = f"{module:<{width}}"
+        for kind, col_width in [("build", 9), ("export", 10)]:
+            row += f"  {times[kind]:>{col_width}.2f}"
+            if kind not in base:
+                row += f"  {'-':>9}"
+                continue
+            change = (times[kind] - base[kind]) / base[kind] * 100
+            row += f"  {change:>+8.0f}%"
+            if change > threshold:
+                regressions.append(f"{module} {kind}")
+        print(row)
+    return regressions
+
+
+@click.command()
+@click.option(
+    "-f",
+    "--file",
+    "files",
+    multiple=True,
+    help="Benchmark these modules instead of the default set",
+)
+@click.option(
+    "-n", "--repeat", "repeat", default=3, show_default=True, help="Runs per module"
+)
+@click.option(
+    "--baseline",
+    "baseline_path",
+    default="bench_baseline.json",
+    show_default=True,
+    type=click.Path(path_type=Path),
+)
+@click.option(
+    "--threshold",
+    default=20.0,
+    show_default=True,
+    help="Percent slowdown against the baseline that counts as a regression",
+)
+@click.option(
+    "--update-baseline",
+    is_flag=True,
+    help="Store this run's medians as the new baseline",
+)
+@click.option(
+    "--mesh-profile",
+    "mesh_profile",
+    type=click.Choice(list(mesh_profiles)),
+    default="print",
+    show_default=True,
+)
+@click.option(
+    "--cold/--warm",
+    default=True,
+    show_default=True,
+    help="Start every run with empty caches, or use the persistent ones",
+)
+def main(files, repeat, baseline_path, threshold, update_baseline, mesh_profile, cold):
+    files = [Path(f) for f in files or bench_files]
+    if not update_baseline:
+        try:
+            baseline = json.loads(baseline_path.read_text())
+        except FileNotFoundError:
+            print(
+                f"Error: no baseline at {baseline_path}, "
+                "run with --update-baseline to create one"
+            )
+            sys.exit(1)
+    # A fresh spawned process per run so every build starts from a cold module
+    # cache, the same as a real export
+    ctx = multiprocessing.get_context("spawn")
+    current = {}
+    with ctx.Pool(1, maxtasksperchild=1) as p:
+        for path in files:
+            module = ".".join(path.with_suffix("").parts)
+            runs = []
+            for i in range(repeat):
+                print(f"Benchmarking {module} ({i + 1}/{repeat})")
+                runs.append(p.apply(_run, (module, path, mesh_profile, cold)))
+            current[module] = {
+                "build": statistics.median(r[0] for r in runs),
+                "export": statistics.median(r[1] for r in runs),
+            }
+
+    if update_baseline:
+        baseline_path.write_text(json.dumps(current, indent=2))
+        print(f"Saved baseline to {baseline_path}")
+        return
+
+    regressions = _compare(current, baseline, threshold)
+    if regressions:
+        print(f"Regressed by more than {threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,8 @@ Print setting recommendations:
 
 from build123d import *
 
+from lib.preview import chamfer
+
 
 button_dia = 6
 button_depth = 1.8 - 0.85
@@ -6,6 +6,8 @@ https://www.thingiverse.com/thing:2525047
 from build123d import *
 from math import sqrt, radians, cos, sin
 
+from lib.preview import fillet
+
 outer_flat_dist = 79
 inner_flat_dist = 57.92
 lip_flat_dist = 64.72
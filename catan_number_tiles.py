@@ -5,9 +5,12 @@ https://www.thingiverse.com/thing:2525047
 
 from pathlib import Path
 from build123d import *
-from functools import cache
+from functools import cache, partial
 from itertools import product
 
+from lib.memo import memoize
+from lib.preview import Text
+
 tile_dia = 25
 tile_thickness = 2
 
@@ -61,6 +64,7 @@ def get_dice_combos(val, dice=2, faces=6):
     return count
 
 
+@memoize
 def build_tile(letter, number, dots, multipart=False):
     with BuildPart() as tile:
         Cylinder(
@@ -98,13 +102,14 @@ def build_tile(letter, number, dots, multipart=False):
             with BuildSketch(top_face) as number_cutout_sketch:
                 offset(objects=number_sketch.faces(), amount=number_cutout_clearance)
             extrude(amount=-number_cutout_depth, mode=Mode.SUBTRACT)
-    return tile
+    return tile.part
 
 
+# Built lazily, exporting a single tile shouldn't pay for all 36
 results = {
-    f"{letter}_{number}{'_multipart' if multipart else ''}": build_tile(
-        letter, number, get_dice_combos(number), multipart=multipart
-    ).part
+    f"{letter}_{number}{'_multipart' if multipart else ''}": partial(
+        build_tile, letter, number, get_dice_combos(number), multipart=multipart
+    )
     for (letter, number), multipart in product(numbers.items(), [True, False])
 }
 
@@ -116,6 +121,10 @@ if __name__ == "__main__":
     try:
         from ocp_vscode import *
 
-        show(*list(results.values()), names=list(results.keys()), measure_tools=True)
+        show(
+            *[build() for build in results.values()],
+            names=list(results.keys()),
+            measure_tools=True,
+        )
     except ImportError:
         pass
@@ -8,6 +8,8 @@ import logging
 from math import tan, radians
 from build123d import *
 
+from lib.preview import fillet, chamfer
+
 density = 0.0077  # g/mm^3
 
 inputs = {
@@ -15,6 +15,8 @@ Print setting recommendations:
 
 from build123d import *
 
+from lib.preview import chamfer
+
 from vitamins import hinge
 
 first_layer_thickness = 0.2
@@ -22,6 +22,8 @@ import logging
 from build123d import *
 from bd_warehouse.thread import IsoThread
 
+from lib.threads import cached_thread
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
@@ -35,7 +37,8 @@ base_dia = 19.3
 
 # No idea if the thread is actually ISO, but this reduces the design space
 # significantly which is convenient
-_inner_thread = IsoThread(
+_inner_thread = cached_thread(
+    IsoThread,
     major_diameter=16,
     pitch=11.7 / 8,
     length=thread_len,
@@ -44,7 +47,8 @@ _inner_thread = IsoThread(
     interference=0,
 )
 
-_outer_thread = IsoThread(
+_outer_thread = cached_thread(
+    IsoThread,
     major_diameter=18,
     pitch=2.5,
     length=thread_len,
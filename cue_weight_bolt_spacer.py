@@ -6,9 +6,14 @@ Print Settings:
 - Material: not PLA, PETG preferred
 """
 
+from functools import partial
+
 from build123d import *
 from bd_warehouse.thread import IsoThread
 
+from lib.preview import chamfer
+from lib.threads import cached_thread
+
 
 # thread_length = 27
 def build(thread_length, thread_maj_dia, thread_pitch, hex_dia, end_chamfer=0.1):
@@ -17,7 +22,8 @@ def build(thread_length, thread_maj_dia, thread_pitch, hex_dia, end_chamfer=0.1)
     hex_tol = 0.2
     hex_relief_dia = 0.4
 
-    _thread = IsoThread(
+    _thread = cached_thread(
+        IsoThread,
         major_diameter=thread_maj_dia - thread_tol,
         pitch=thread_pitch,
         length=thread_length,
@@ -56,8 +62,10 @@ def build(thread_length, thread_maj_dia, thread_pitch, hex_dia, end_chamfer=0.1)
 
 # Other details at
 # https://www.cuetec.com/products/tip-shaft-and-cue-maintenance/acueweight-kit/
+# Built lazily, each threaded spacer takes a while
 cuetec_results = {
-    f"cuetec-{tl}mm": build(
+    f"cuetec-{tl}mm": partial(
+        build,
         thread_length=tl,
         thread_maj_dia=18,
         thread_pitch=2.5,
@@ -69,7 +77,8 @@ cuetec_results = {
 
 # Thread is nominally 1/2", 12TPI
 player_results = {
-    f"player-{tl}mm": build(
+    f"player-{tl}mm": partial(
+        build,
         thread_length=tl,
         thread_maj_dia=0.5 * IN,
         thread_pitch=IN / 12,
@@ -85,7 +94,9 @@ if __name__ == "__main__":
     try:
         from ocp_vscode import *
 
-        show_all(
+        show(
+            *[build() for build in results.values()],
+            names=list(results.keys()),
             reset_camera=Camera.KEEP,
         )
     except ImportError:
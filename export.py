@@ -3,12 +3,18 @@ import click
 from pathlib import Path
 import os
 import shutil
+import sys
+import threading
 from importlib import import_module
 import json
 
 import cadquery as cq
 from cadquery import exporters
-from build123d import Mesher, export_step, export_brep, ShapeList, Compound
+from build123d import export_step, export_brep, ShapeList, Compound
+
+from exporter import cache, deps, history, mesh, output, progress, scheduler, shards
+from exporter import timing, watch
+from lib import fingerprint, preview
 
 
 export_types = [
@@ -18,20 +24,39 @@ export_types = [
     ".brep",
 ]
 
+export_dir = Path("export")
+
+# Output of each export task, rather than interleaving all of them on stdout
+log_dir = cache.cache_dir / "logs"
+
+# Formats written from a tessellation rather than the exact geometry
+mesh_types = [
+    ".stl",
+    ".3mf",
+]
+
+# (linear, angular) deflection for each mesh quality profile. Linear deflection
+# is relative to the size of each edge, angular deflection is in radians.
+mesh_profiles = {
+    "preview": (0.01, 0.5),
+    "print": (0.001, 0.1),
+    "archival": (0.0002, 0.05),
+}
+
+# Lazy results built by this process, by (module, name)
+_built = {}
+
 
-def export_build123d(result, path):
+def export_build123d(result, path, mesh_profile="print"):
     export_type = path.suffix
-    path = str(path)
     if isinstance(result, ShapeList):
         result = Compound(result)
     if export_type == ".step":
-        export_step(result, path)
+        export_step(result, str(path))
     elif export_type == ".brep":
-        export_brep(result, path)
-    elif export_type in [".stl", ".3mf"]:
-        exporter = Mesher()
-        exporter.add_shape(result)
-        exporter.write(path)
+        export_brep(result, str(path))
+    elif export_type in mesh_types:
+        export_mesh(result, [path], mesh_profile)
     else:
         print(f"Error: {result} doesn't have an exporter for {export_type}")
 
@@ -43,42 +68,433 @@ def export_cadquery(result, path):
     exporters.export(result, str(path))
 
 
-def _do_export(module, path):
-    try:
+def export_mesh(result, paths, mesh_profile="print"):
+    """Tessellate result once and write that mesh to every path"""
+    with timing.phase("convert"):
+        if isinstance(result, cq.Workplane):
+            result = cq.Compound.makeCompound(
+                [v for v in result.vals() if isinstance(v, cq.Shape)]
+            )
+        if isinstance(result, cq.Shape):
+            # Mesh CadQuery parts through the same OCCT shape wrapped by build123d
+            result = Compound(result.wrapped)
+        elif isinstance(result, ShapeList):
+            result = Compound(result)
+    with timing.phase("tessellate"):
+        meshes = mesh.tessellate(result, *mesh_profiles[mesh_profile])
+    for path in paths:
+        with timing.phase("export", path.suffix):
+            mesh.writers[path.suffix](meshes, path)
+
+
+def _load_results(module):
+    """Import a module and return its results
+
+    Imports are cached in sys.modules, so each worker builds a module's
+    geometry at most once no matter how many of its results it exports.
+    Results may be zero argument builders, see _build_result.
+    """
+    if module not in sys.modules:
         print(f"Importing {module}")
-        mod = import_module(module)
-    except Exception as e:
-        print(f"Failed to import {module}")
-        raise e
+        try:
+            with timing.phase("import"):
+                import_module(module)
+        except Exception as e:
+            print(f"Failed to import {module}")
+            raise e
+    mod = sys.modules[module]
 
     if hasattr(mod, "result"):
-        results = {"default": mod.result}
+        return {"default": mod.result}
     elif hasattr(mod, "results"):
-        results = mod.results
+        return mod.results
+    print(f"Warning: Module {module} doesn't contain any results")
+    return {}
+
+
+def _result_mesh_profile(module, name, default):
+    """Mesh profile for a result, modules can override the default with either
+    `mesh_profile = "archival"` or `mesh_profile = {"result_name": "archival"}`
+    """
+    override = getattr(sys.modules[module], "mesh_profile", None)
+    if isinstance(override, dict):
+        override = override.get(name)
+    return override or default
+
+
+def _build_result(module, name):
+    """A module's result, calling it first if the module made it lazy
+
+    Modules with many or expensive results can map names to zero argument
+    builders instead of shapes, e.g. `results = {"a": partial(build, 1)}`, so
+    only the results actually exported are ever built. Built results are kept
+    for the other formats this worker exports.
+    """
+    key = (module, name)
+    if key not in _built:
+        result = _load_results(module)[name]
+        if callable(result):
+            print(f"Building {module} {name}")
+            with timing.phase("build"):
+                result = result()
+        _built[key] = result
+    return _built[key]
+
+
+def _list_results(module, path, mesh_profile, result_names=()):
+    """Import a module, export the results it built and list its lazy ones
+
+    Results built at import time are exported right away by the worker that
+    imported the module, any other worker would have to build them all again.
+    Only lazy results are worth exporting in tasks of their own. Returns the
+    names of those, the paths exported here and the timings.
+    """
+    results = _load_results(module)
+    if result_names:
+        results = {n: r for n, r in results.items() if n in result_names}
+    timings = timing.drain(module=module)
+    built = [n for n, r in results.items() if not callable(r)]
+    exported, export_timings = _export_results(module, path, built, mesh_profile)
+    lazy = [n for n, r in results.items() if callable(r)]
+    return lazy, exported, timings + export_timings
+
+
+def _export_result(module, path, name, types, mesh_profile):
+    """Export one result of a module to one or more formats
+
+    types is either a single exact format or several mesh formats sharing one
+    tessellation. Returns the paths written and the timings of each phase.
+    """
+    result = _build_result(module, name)
+    mesh_profile = _result_mesh_profile(module, name, mesh_profile)
+    export_paths = [
+        export_dir / (path.with_stem(path.stem + f"-{name}").with_suffix(t))
+        for t in types
+    ]
+    if isinstance(result, cq.Assembly):
+        with timing.phase("convert"):
+            result = result.toCompound()
+    # Ensure export dir exists prior to writing to it
+    os.makedirs(export_paths[0].parent, exist_ok=True)
+    try:
+        # Previous exports stay in place until the new ones are complete
+        with output.atomic_paths(export_paths) as tmp_paths:
+            if types[0] in mesh_types:
+                print(
+                    f"Exporting {mesh_profile} mesh to "
+                    f"{', '.join(map(str, export_paths))}"
+                )
+                export_mesh(result, tmp_paths, mesh_profile)
+            elif "cadquery" in str(type(result)):
+                print(f"Exporting CadQuery part to {export_paths[0]}")
+                with timing.phase("export", types[0]):
+                    export_cadquery(result, tmp_paths[0])
+            else:
+                print(f"Exporting build123d part to {export_paths[0]}")
+                with timing.phase("export", types[0]):
+                    export_build123d(result, tmp_paths[0])
+    except Exception as e:
+        print(f"Failed to export to {', '.join(map(str, export_paths))}")
+        raise e
+    exported = [p for p in export_paths if p.exists()]
+    return exported, timing.drain(module=module, result=name)
+
+
+def _export_results(module, path, names, mesh_profile):
+    """Export the named results of a module to every format
+
+    Returns the paths written and the timings of each phase.
+    """
+    # All mesh formats are exported together so they can share a tessellation
+    groups = [(t,) for t in export_types if t not in mesh_types]
+    mesh_group = tuple(t for t in export_types if t in mesh_types)
+    if mesh_group:
+        groups.append(mesh_group)
+    exported = []
+    timings = []
+    for name in names:
+        for types in groups:
+            group_exported, group_timings = _export_result(
+                module, path, name, types, mesh_profile
+            )
+            exported += group_exported
+            timings += group_timings
+    return exported, timings
+
+
+def _export_modules(
+    sched, export_args, mesh_profile, result_names=(), on_finished=None
+):
+    """Export every result of the modules in export_args with a scheduler
+
+    Modules are imported first, which exports the results they build on
+    import, and a task for each of their lazy results is queued as soon as
+    those are known. on_finished is called with a module and its exported paths
+    as soon as all of its tasks are done, while the rest keep running.
+    """
+    paths = dict(export_args)
+    memory = history.memory_estimates(paths)
+    past = history.load()
+    expected = {m: shards.cost(m, p, past) for m, p in export_args}
+    report = progress.Progress(expected, sched.jobs)
+    # Tasks of each module still to finish
+    unfinished = {}
+    for module in paths:
+        sched.add(
+            scheduler.Task(
+                module,
+                _list_results,
+                module,
+                paths[module],
+                mesh_profile,
+                result_names,
+                memory=memory[module],
+            )
+        )
+        unfinished[module] = 1
+        report.add()
+    exported = {module: [] for module in paths}
+    timings = []
+    for task, value in sched.run():
+        module = task.args[0]
+        if task.fn is _list_results:
+            names, task_exported, task_timings = value
+            exported[module] += task_exported
+            timings += task_timings
+            # Each lazy result is built once, by the task exporting all of its
+            # formats
+            for name in names:
+                sched.add(
+                    scheduler.Task(
+                        f"{module} {name}",
+                        _export_results,
+                        module,
+                        paths[module],
+                        [name],
+                        mesh_profile,
+                        memory=memory[module],
+                    )
+                )
+                unfinished[module] += 1
+                report.add()
+        else:
+            task_exported, task_timings = value
+            exported[module] += task_exported
+            timings += task_timings
+        report.finished(module, task)
+        unfinished[module] -= 1
+        if not unfinished[module]:
+            report.module_finished(module)
+            if on_finished is not None:
+                on_finished(module, exported[module])
+    return exported, timings
+
+
+def _report_warm_start():
+    from exporter import warm
+
+    saved = sum(warm.preload_seconds.values())
+    print(f"Worker {os.getpid()} started warm, skipped {saved:.1f}s of imports")
+
+
+def _pool_context(warm_start, paths=()):
+    """Multiprocessing context for export workers, forking them warm if possible
+
+    Vitamins used by the modules at paths are preloaded too. The forkserver
+    outlives the pool and keeps the preloads of the first pool it started.
+    Returns the context and the worker initializer.
+    """
+    if warm_start and "forkserver" in multiprocessing.get_all_start_methods():
+        # Pay for importing the CAD kernels and vitamins once in the
+        # forkserver rather than once per worker
+        vitamins = deps.vitamin_modules(deps.graph(paths))
+        os.environ["EXPORT_WARM_VITAMINS"] = ",".join(vitamins)
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(["exporter.warm", "exporter.warm_vitamins"])
+        return ctx, _report_warm_start
+    return multiprocessing.get_context(), None
+
+
+def _export_args(files):
+    """(module, path) of each part module in files, or in the whole tree"""
+    if files:
+        files = [Path(f) for f in files]
     else:
-        print(f"Warning: Module {module} doesn't contain any results")
+        files = Path(".").glob("**/*.py")
+    export_args = []
+    for path in files:
+        if (
+            path.suffix != ".py"
+            or path.stem in ["export", "bench"]
+            or str(path).startswith(".")
+            or any(d in path.parts for d in deps.library_dirs)
+        ):
+            continue
+        module = ".".join(path.with_suffix("").parts)
+        export_args.append((module, path))
+    return export_args
+
+
+def _export(
+    export_args,
+    jobs,
+    warm_start,
+    mesh_profile,
+    result_names,
+    use_cache,
+    run_options,
+    cancel=None,
+):
+    """Restore unchanged modules from cache and export the rest
+
+    run_options are passed on to the Scheduler. Returns the tasks that failed
+    when running with keep_going.
+
+    Passing a cancel event means this is a watch mode rebuild. Those always
+    build in fresh workers, never in this long lived process, and don't preload
+    vitamins that may be edited while watching.
+    """
+    cache_keys = {}
+    outputs = {}
+    if use_cache:
+        uncached_args = []
+        for module, path in export_args:
+            settings = {"mesh_profile": mesh_profile}
+            if result_names:
+                settings["results"] = sorted(result_names)
+            if preview.enabled():
+                settings["preview"] = True
+            key = cache.module_key(path, extra=settings)
+            restored = cache.restore(key, export_dir)
+            if restored is not None:
+                print(f"Restored {module} from cache")
+                outputs[module] = restored
+                continue
+            cache_keys[module] = key
+            uncached_args.append((module, path))
+        export_args = uncached_args
+
+    # A filtered export doesn't know which of the other results still exist
+    prune = not result_names
+    if not export_args:
+        # Everything was restored, there's no need for workers or preloading
+        print("Nothing left to export")
+        if prune:
+            output.prune(export_dir, outputs)
+        return []
+
+    # Don't allocate more jobs pool than we actually have
+    jobs = max(1, min(jobs, len(export_args)))
+
+    # Timeouts work by killing the worker, so they need a pool even for one job
+    ctx = initializer = None
+    if jobs > 1 or cancel is not None or run_options["timeout"] is not None:
+        print(f"Exporting with pool size {jobs}")
+        preload = [] if cancel is not None else [path for _, path in export_args]
+        ctx, initializer = _pool_context(warm_start, preload)
+    else:
+        print(f"Exporting sequentially")
+    shutil.rmtree(log_dir, ignore_errors=True)
+    os.makedirs(log_dir)
+    print(f"Task output is logged to {log_dir}")
+    sched = scheduler.Scheduler(
+        jobs, ctx, initializer, log_dir=log_dir, cancel=cancel, **run_options
+    )
+
+    def finished(module, paths):
+        print(f"Finished {module}, {len(paths)} files")
+        # Modules that failed keep their previous outputs and aren't cached
+        outputs[module] = paths
+        if module in cache_keys:
+            cache.store(cache_keys[module], export_dir, paths)
+
+    _, timings = _export_modules(
+        sched, export_args, mesh_profile, result_names, finished
+    )
+
+    if prune:
+        output.prune(export_dir, outputs)
+
+    if timings:
+        # Previews skip the expensive work, their timings would skew sharding
+        if not preview.enabled():
+            history.update(timings)
+        # Kept out of export/ so it isn't mistaken for a model or merged
+        # across CI shards
+        os.makedirs(timing.report_path.parent, exist_ok=True)
+        with output.atomic_paths([timing.report_path]) as (tmp,):
+            timing.write(timings, tmp)
+        print(
+            f"Export timings (details in {timing.report_path.relative_to(deps.root)}):"
+        )
+        print(timing.summary(timings))
+
+    if sched.failures:
+        print(f"{len(sched.failures)} tasks failed:")
+        for task, error in sched.failures:
+            print(f"  {task.name}: {error!r}")
+    return sched.failures
+
+
+def _rebuild(export_args, *options, cancel):
+    try:
+        _export(export_args, *options, cancel=cancel)
+    except scheduler.Cancelled:
+        print("Rebuild cancelled")
         return
+    except Exception as e:
+        print(f"Error: rebuild failed: {e}")
+    print("Watching for changes, press Ctrl+C to stop")
 
-    for name, result in results.items():
-        for t in export_types:
-            export_path = Path("export") / (
-                path.with_stem(path.stem + f"-{name}").with_suffix(t)
-            )
-            if isinstance(result, cq.Assembly):
-                result = result.toCompound()
-            # Ensure export dir exists prior to writing to it
-            export_dir = export_path.parent
-            os.makedirs(export_dir, exist_ok=True)
-            try:
-                if "cadquery" in str(type(result)):
-                    print(f"Exporting CadQuery part to {export_path}")
-                    export_cadquery(result, export_path)
-                else:
-                    print(f"Exporting build123d part to {export_path}")
-                    export_build123d(result, export_path)
-            except Exception as e:
-                print(f"Failed to export to {export_path}")
-                raise e
+
+def _watch(files, *options):
+    """Export everything, then re-export modules affected by each change
+
+    A change arriving mid rebuild cancels it, the modules it was exporting are
+    rebuilt along with the newly affected ones. options are passed on to
+    _export.
+    """
+    watcher = watch.Watcher()
+    todo = {path for _, path in _export_args(files)}
+    building = set()
+    build = None
+    cancel = threading.Event()
+    try:
+        while True:
+            waiting = build is not None or todo
+            timeout = scheduler.poll_interval if waiting else None
+            changed = watcher.changes(timeout=timeout)
+            if changed:
+                deps.forget()
+                fingerprint.file_hash.cache_clear()
+                if changed & set(cache.exporter_sources()):
+                    print("Warning: export code changed, restart to pick it up")
+                dep_graph = deps.graph([path for _, path in _export_args(files)])
+                affected = deps.affected(dep_graph, changed)
+                print(f"{len(affected)} modules affected by changes")
+                if build is not None and build.is_alive():
+                    cancel.set()
+                    build.join()
+                    todo |= building
+                todo |= set(affected)
+            if build is not None and not build.is_alive():
+                build = None
+            if todo and build is None:
+                export_args = [(m, p) for m, p in _export_args(files) if p in todo]
+                building, todo = todo, set()
+                cancel = threading.Event()
+                build = threading.Thread(
+                    target=_rebuild,
+                    args=(export_args, *options),
+                    kwargs={"cancel": cancel},
+                )
+                build.start()
+    except KeyboardInterrupt:
+        print("Stopping")
+    finally:
+        cancel.set()
+        if build is not None:
+            build.join()
 
 
 @click.command()
@@ -86,6 +502,13 @@ def _do_export(module, path):
 @click.option(
     "-j", "--jobs", "jobs", default=0, help="Number of jobs to run in parallel"
 )
+@click.option(
+    "--result",
+    "result_names",
+    multiple=True,
+    metavar="NAME",
+    help="Only export results with this name, lazy results are only built if named",
+)
 @click.option(
     "--matrix",
     is_flag=True,
@@ -94,50 +517,158 @@ def _do_export(module, path):
         "GitHub Actions matrix"
     ),
 )
-def main(files, jobs, matrix):
-    if files:
-        files = [Path(f) for f in files]
-    else:
-        files = Path(".").glob("**/*.py")
-
+@click.option(
+    "--shards",
+    "shard_count",
+    type=click.IntRange(min=1),
+    help=(
+        "With --matrix, pack modules into this many shards of similar export "
+        "time instead of one entry per module"
+    ),
+)
+@click.option(
+    "--no-cache",
+    "no_cache",
+    is_flag=True,
+    help="Rebuild every module instead of restoring unchanged ones from cache",
+)
+@click.option(
+    "--since",
+    "since",
+    metavar="REV",
+    help="Only export modules whose sources or dependencies changed since REV",
+)
+@click.option(
+    "--warm/--cold",
+    "warm_start",
+    default=True,
+    help="Fork workers from a server with the CAD kernels already imported",
+)
+@click.option(
+    "--watch",
+    "watch_tree",
+    is_flag=True,
+    help="Keep running and re-export modules affected by each saved change",
+)
+@click.option(
+    "--timeout",
+    type=float,
+    metavar="SECONDS",
+    help="Kill and fail any task running longer than this",
+)
+@click.option(
+    "--retries",
+    default=0,
+    show_default=True,
+    help="Times to retry failed tasks, on fresh workers, timeouts aren't retried",
+)
+@click.option(
+    "--keep-going",
+    "keep_going",
+    is_flag=True,
+    help="Export everything else when a task fails, then exit with an error",
+)
+@click.option(
+    "--max-tasks-per-child",
+    "max_tasks_per_child",
+    type=click.IntRange(min=1),
+    help="Replace workers after this many tasks to bound OCCT memory growth",
+)
+@click.option(
+    "--memory-budget",
+    "memory_budget",
+    type=click.IntRange(min=1),
+    metavar="MB",
+    help=(
+        "Only start tasks while the peak memory use predicted from previous "
+        "runs stays under this, largest first"
+    ),
+)
+@click.option(
+    "--mesh-profile",
+    "mesh_profile",
+    type=click.Choice(list(mesh_profiles)),
+    default="print",
+    show_default=True,
+    help="Default tessellation quality for STL and 3MF exports",
+)
+@click.option(
+    "--preview",
+    "preview_mode",
+    is_flag=True,
+    help=(
+        "Substitute simplified threads, fillets, chamfers and text for fast "
+        "approximate exports"
+    ),
+)
+def main(
+    files,
+    jobs,
+    result_names,
+    matrix,
+    shard_count,
+    no_cache,
+    since,
+    warm_start,
+    watch_tree,
+    timeout,
+    retries,
+    keep_going,
+    max_tasks_per_child,
+    memory_budget,
+    mesh_profile,
+    preview_mode,
+):
+    if preview_mode:
+        # Inherited by the workers, and by the modules they import
+        os.environ["EXPORT_PREVIEW"] = "1"
     if jobs <= 0:
         jobs = multiprocessing.cpu_count()
-    export_args = []
-    for path in files:
-        if (
-            path.suffix != ".py"
-            or path.stem == "export"
-            or str(path).startswith(".")
-            or "vitamins" in str(path)
-        ):
-            continue
-        module = ".".join(path.with_suffix("").parts)
-        export_args.append((module, path))
+    export_args = _export_args(files)
+
+    if since:
+        changed = deps.changed_since(since)
+        if changed & set(cache.exporter_sources()):
+            print(f"Export code changed since {since}, exporting everything")
+        else:
+            dep_graph = deps.graph([path for _, path in export_args])
+            affected = deps.affected(dep_graph, changed)
+            export_args = [(m, p) for m, p in export_args if p in affected]
+            print(f"{len(export_args)} modules affected by changes since {since}")
+
     if matrix:
         print("Exporting manifest")
-        manifest = [f"{module}|{str(path)}" for module, path in export_args]
+        if shard_count:
+            manifest = []
+            packed = shards.pack(export_args, shard_count, history.load())
+            for i, (cost, shard_args) in enumerate(packed, 1):
+                paths = [str(path) for _, path in shard_args]
+                flags = " ".join(f"-f {path}" for path in paths)
+                print(f"shard-{i} (~{cost:.0f}s): python export.py {flags}")
+                manifest.append(f"shard-{i}|{' '.join(paths)}")
+        else:
+            manifest = [f"{module}|{str(path)}" for module, path in export_args]
         with open("manifest.json", "w") as f:
             f.write(json.dumps(manifest))
         return 0
 
-    print("Cleaning export folder")
-    try:
-        shutil.rmtree("export")
-    except FileNotFoundError:
-        pass
-    os.makedirs("export")
+    os.makedirs(export_dir, exist_ok=True)
 
-    # Don't allocate more jobs pool than we actually have
-    jobs = min(jobs, len(export_args))
+    options = (jobs, warm_start, mesh_profile, result_names, not no_cache)
+    run_options = {
+        "timeout": timeout,
+        "retries": retries,
+        "keep_going": keep_going,
+        "max_tasks_per_child": max_tasks_per_child,
+        "memory_budget": memory_budget,
+    }
+    if watch_tree:
+        # A failing module shouldn't end the watch
+        _watch(files, *options, run_options | {"keep_going": True})
+        return
 
-    if jobs > 1:
-        print(f"Exporting with pool size {jobs}")
-        with multiprocessing.Pool(jobs) as p:
-            p.starmap(_do_export, export_args)
-    else:
-        print(f"Exporting sequentially")
-        for module, path in export_args:
-            _do_export(module, path)
+    if _export(export_args, *options, run_options):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
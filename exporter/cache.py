@@ -0,0 +1,123 @@
+"""Content-addressed cache of exported files
+
+Each part module's exports are stored under a key hashed from everything that
+can change them: the module source, its transitive local imports, the res/
+assets those read, the export code itself and the CAD toolchain versions.
+Restoring an entry marks it as recently used, the least recently used entries
+are removed once the cache grows past max_size.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from exporter import deps, output
+from lib.fingerprint import file_hash, toolchain_versions
+
+cache_dir = deps.root / ".cache" / "export"
+
+# Bytes of exports kept before the least recently used entries get removed
+max_size = 2 << 30
+
+
+def exporter_sources():
+    """Files whose changes invalidate every cached export"""
+    sources = [deps.root / "export.py", deps.root / "lib" / "fingerprint.py"]
+    return sources + sorted((deps.root / "exporter").glob("*.py"))
+
+
+def module_key(path, extra=None):
+    """Cache key for the exports of the part module at path
+
+    extra can hold any JSON serializable export settings that also affect the
+    output.
+    """
+    sources, assets = deps.transitive(path)
+    h = hashlib.sha256()
+    h.update(json.dumps(toolchain_versions(), sort_keys=True).encode())
+    h.update(json.dumps(extra, sort_keys=True).encode())
+    for f in sorted(sources | assets | set(exporter_sources())):
+        h.update(str(f.relative_to(deps.root)).encode())
+        h.update(file_hash(f).encode())
+    return h.hexdigest()
+
+
+def restore(key, export_dir):
+    """Copy cached exports for key into export_dir, leaving identical files be
+
+    Returns the list of restored paths, or None on a cache miss.
+    """
+    entry = cache_dir / key
+    manifest = entry / "manifest.json"
+    try:
+        files = json.loads(manifest.read_text())
+        # Recently used as far as eviction is concerned
+        os.utime(manifest)
+        restored = []
+        for rel in files:
+            dst = Path(export_dir) / rel
+            os.makedirs(dst.parent, exist_ok=True)
+            with output.atomic_paths([dst]) as (tmp,):
+                shutil.copy2(entry / "files" / rel, tmp)
+            restored.append(dst)
+    except FileNotFoundError:
+        # Missing, or evicted by another run while being restored
+        return None
+    return restored
+
+
+def store(key, export_dir, files):
+    """Save exported files (paths inside export_dir) under key"""
+    os.makedirs(cache_dir, exist_ok=True)
+    # Build the entry off to the side and rename it into place so concurrent
+    # or interrupted runs never see a partial entry
+    tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=cache_dir))
+    rels = []
+    for f in files:
+        rel = Path(f).relative_to(export_dir)
+        dst = tmp / "files" / rel
+        os.makedirs(dst.parent, exist_ok=True)
+        shutil.copy2(f, dst)
+        rels.append(str(rel))
+    (tmp / "manifest.json").write_text(json.dumps(rels))
+    try:
+        os.replace(tmp, cache_dir / key)
+    except OSError:
+        # Another run already stored this key
+        shutil.rmtree(tmp)
+    evict()
+
+
+def _entry_size(entry):
+    return sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+
+
+def evict():
+    """Remove the least recently used entries until the cache fits max_size"""
+    with open(cache_dir / ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        entries = []
+        # Entries are the directories named by their key, next to the history,
+        # logs and entries still being written
+        for entry in cache_dir.iterdir():
+            if entry.name.startswith("."):
+                continue
+            try:
+                used = (entry / "manifest.json").stat().st_mtime
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            entries.append((used, _entry_size(entry), entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= max_size:
+                break
+            # Renamed out of the way first so no run restores a half removed
+            # entry
+            doomed = Path(tempfile.mkdtemp(prefix=".tmp-", dir=cache_dir))
+            os.replace(entry, doomed / entry.name)
+            shutil.rmtree(doomed)
+            total -= size
@@ -0,0 +1,154 @@
+"""Static dependency scanning for part modules
+
+Everything here works off the AST so no CAD code is ever executed.
+"""
+
+import ast
+import re
+import subprocess
+from functools import cache
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+
+# Directories holding shared code rather than exportable parts
+library_dirs = [
+    "vitamins",
+    "exporter",
+    "lib",
+]
+
+# Matches asset references like "res/foo.step", "./res/foo.step" or
+# Path(__file__).parent / "res/foo.step"
+_res_pattern = re.compile(r"(?:^|/)(res/[^\s\"']+)")
+
+
+def _module_file(name):
+    """Resolve a dotted module name to a file in this repo, if there is one"""
+    if not name:
+        return None
+    path = root.joinpath(*name.split("."))
+    for candidate in [path.parent / (path.name + ".py"), path / "__init__.py"]:
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _imported_names(node, path):
+    if isinstance(node, ast.Import):
+        return [alias.name for alias in node.names]
+    if isinstance(node, ast.ImportFrom):
+        base = node.module or ""
+        if node.level:
+            package = path.parent.relative_to(root).parts
+            package = package[: len(package) - node.level + 1]
+            base = ".".join([*package, base] if base else package)
+        # `from a import b` may import either a submodule or an attribute of a
+        return [base] + [f"{base}.{alias.name}" for alias in node.names]
+    return []
+
+
+@cache
+def _parse(path):
+    return ast.parse(path.read_text(), filename=str(path))
+
+
+@cache
+def local_imports(path):
+    """Files in this repo directly imported by the module at path"""
+    path = Path(path).resolve()
+    found = set()
+    for node in ast.walk(_parse(path)):
+        for name in _imported_names(node, path):
+            parts = name.split(".")
+            # Importing a.b.c also runs a/__init__.py and a/b/__init__.py
+            for i in range(1, len(parts) + 1):
+                module_file = _module_file(".".join(parts[:i]))
+                if module_file is not None and module_file != path:
+                    found.add(module_file)
+    return frozenset(found)
+
+
+@cache
+def res_files(path):
+    """Files under res/ referenced by string literals in the module at path"""
+    path = Path(path).resolve()
+    found = set()
+    for node in ast.walk(_parse(path)):
+        if not (isinstance(node, ast.Constant) and isinstance(node.value, str)):
+            continue
+        match = _res_pattern.search(node.value)
+        if match and (root / match.group(1)).is_file():
+            found.add(root / match.group(1))
+    return frozenset(found)
+
+
+def transitive(path):
+    """All local sources and res/ assets the module at path depends on
+
+    The returned sources include path itself.
+    """
+    path = Path(path).resolve()
+    sources = {path}
+    assets = set()
+    queue = [path]
+    while queue:
+        current = queue.pop()
+        assets |= res_files(current)
+        for dep in local_imports(current):
+            if dep not in sources:
+                sources.add(dep)
+                queue.append(dep)
+    return sources, assets
+
+
+def graph(paths):
+    """Map each module path to every local file it transitively depends on"""
+    result = {}
+    for path in paths:
+        sources, assets = transitive(path)
+        result[path] = sources | assets
+    return result
+
+
+def affected(dep_graph, changed):
+    """Module paths in dep_graph depending on any of the changed files"""
+    changed = {Path(f).resolve() for f in changed}
+    return [path for path, files in dep_graph.items() if files & changed]
+
+
+def changed_since(rev):
+    """Files that differ between rev and the working tree, including new ones"""
+    diff = subprocess.run(
+        ["git", "diff", "--name-only", rev, "--"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    untracked = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return {root / f for f in (diff + untracked).splitlines() if f}
+
+
+def vitamin_modules(dep_graph):
+    """Dotted names of the vitamins used by any module in dep_graph"""
+    vitamins_dir = root / "vitamins"
+    found = set()
+    for files in dep_graph.values():
+        for f in files:
+            if f.parent == vitamins_dir and f.suffix == ".py" and f.stem != "__init__":
+                found.add(f"vitamins.{f.stem}")
+    return sorted(found)
+
+
+def forget():
+    """Drop parsed sources, for long running processes that see files change"""
+    _parse.cache_clear()
+    local_imports.cache_clear()
+    res_files.cache_clear()
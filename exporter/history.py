@@ -0,0 +1,53 @@
+"""Per module export costs remembered from previous runs
+
+Updated from the timings of every export and used to plan work, e.g. to
+balance CI shards.
+"""
+
+import json
+import os
+import statistics
+import tempfile
+
+from exporter import cache
+
+history_path = cache.cache_dir / "history.json"
+
+
+def load():
+    """{module: {"wall": seconds, "peak_rss_mb": megabytes}} of past exports"""
+    try:
+        return json.loads(history_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def update(timings):
+    """Record the totals of the modules exported in timings"""
+    totals = {}
+    for r in timings:
+        t = totals.setdefault(r["module"], {"wall": 0, "peak_rss_mb": 0})
+        # Summed across workers, so this is the work a module needs rather
+        # than how long it took with the pool it happened to run in
+        t["wall"] += r["wall"]
+        t["peak_rss_mb"] = max(t["peak_rss_mb"], r["peak_rss_mb"])
+    if not totals:
+        return
+    merged = load() | totals
+    os.makedirs(history_path.parent, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=history_path.parent)
+    with os.fdopen(fd, "w") as f:
+        json.dump(merged, f, indent=2, sort_keys=True)
+    os.replace(tmp, history_path)
+
+
+def memory_estimates(modules):
+    """Predicted peak RSS in MB of each module's tasks
+
+    Modules never exported are assumed to need the median of those that were,
+    or nothing at all without any history.
+    """
+    past = load()
+    peaks = [h["peak_rss_mb"] for h in past.values()]
+    default = statistics.median(peaks) if peaks else 0
+    return {m: past[m]["peak_rss_mb"] if m in past else default for m in modules}
@@ -0,0 +1,181 @@
+"""Tessellation and mesh writers working on NumPy arrays
+
+A shape is meshed once with BRepMesh, each face's Poly_Triangulation is copied
+into vertex/triangle arrays and every writer works from those arrays.
+"""
+
+import copy
+import hashlib
+import os
+import uuid
+from typing import NamedTuple
+
+import numpy as np
+from lib3mf import Lib3MF
+from OCP.BRep import BRep_Tool
+from OCP.BRepMesh import BRepMesh_IncrementalMesh
+from OCP.TopAbs import TopAbs_FACE, TopAbs_REVERSED
+from OCP.TopExp import TopExp_Explorer
+from OCP.TopLoc import TopLoc_Location
+from OCP.TopoDS import TopoDS
+from build123d import Compound
+
+_stl_record = np.dtype(
+    [
+        ("normal", "<f4", (3,)),
+        ("vertices", "<f4", (3, 3)),
+        ("attribute", "<u2"),
+    ]
+)
+
+# Vertices closer than this are merged when writing indexed formats
+_weld_decimals = 6
+
+
+class Mesh(NamedTuple):
+    vertices: np.ndarray  # (n, 3) float64
+    triangles: np.ndarray  # (m, 3) int64 indices into vertices
+    name: str | None = None
+    color: tuple | None = None
+
+
+def _face_arrays(face):
+    loc = TopLoc_Location()
+    poly = BRep_Tool.Triangulation_s(face, loc)
+    if poly is None:
+        return None
+    # OCP doesn't expose the node/triangle buffers, so this copy is the only
+    # per element Python work, everything after it is vectorized
+    vertices = np.array(
+        [poly.Node(i).Coord() for i in range(1, poly.NbNodes() + 1)],
+        dtype=np.float64,
+    )
+    triangles = np.array(
+        [poly.Triangle(i).Get() for i in range(1, poly.NbTriangles() + 1)],
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    triangles -= 1
+    if not loc.IsIdentity():
+        trsf = loc.Transformation()
+        matrix = np.array(
+            [[trsf.Value(r, c) for c in range(1, 5)] for r in range(1, 4)]
+        )
+        vertices = vertices @ matrix[:, :3].T + matrix[:, 3]
+    if face.Orientation() == TopAbs_REVERSED:
+        triangles = triangles[:, [0, 2, 1]]
+    return vertices, triangles
+
+
+def _mesh_part(part):
+    vertices = []
+    triangles = []
+    offset = 0
+    explorer = TopExp_Explorer(part.wrapped, TopAbs_FACE)
+    while explorer.More():
+        arrays = _face_arrays(TopoDS.Face_s(explorer.Current()))
+        explorer.Next()
+        if arrays is None:
+            continue
+        vertices.append(arrays[0])
+        triangles.append(arrays[1] + offset)
+        offset += len(arrays[0])
+    return Mesh(
+        np.concatenate(vertices) if vertices else np.zeros((0, 3)),
+        np.concatenate(triangles) if triangles else np.zeros((0, 3), np.int64),
+        part.label or None,
+        tuple(part.color) if part.color else None,
+    )
+
+
+def tessellate(shape, linear_deflection, angular_deflection):
+    """Mesh a build123d shape, one Mesh per top level part
+
+    linear_deflection is relative to edge size like build123d's Mesher.
+    """
+    # Mesh a copy so triangulations stored on the caller's shape are untouched
+    shape = copy.deepcopy(shape)
+    BRepMesh_IncrementalMesh(
+        shape.wrapped, linear_deflection, True, angular_deflection, True
+    )
+    parts = list(shape) if isinstance(shape, Compound) else [shape]
+    return [m for m in map(_mesh_part, parts) if len(m.triangles)]
+
+
+def write_stl(meshes, path):
+    """Write meshes as one binary STL using a single buffer write"""
+    corners = np.concatenate(
+        [m.vertices[m.triangles] for m in meshes] or [np.zeros((0, 3, 3))]
+    )
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+    records = np.zeros(len(corners), dtype=_stl_record)
+    records["normal"] = normals
+    records["vertices"] = corners
+    header = b"Binary STL".ljust(80, b"\0")
+    count = np.array([len(records)], dtype="<u4")
+    with open(path, "wb") as f:
+        f.write(header + count.tobytes() + records.tobytes())
+
+
+def _weld(mesh):
+    """Merge coincident vertices and drop triangles that collapse"""
+    vertices, inverse = np.unique(
+        np.round(mesh.vertices, _weld_decimals), axis=0, return_inverse=True
+    )
+    triangles = inverse.reshape(-1)[mesh.triangles]
+    keep = (
+        (triangles[:, 0] != triangles[:, 1])
+        & (triangles[:, 1] != triangles[:, 2])
+        & (triangles[:, 2] != triangles[:, 0])
+    )
+    return (
+        np.ascontiguousarray(vertices, dtype=np.float32),
+        np.ascontiguousarray(triangles[keep], dtype=np.uint32),
+    )
+
+
+def _uuid(*parts):
+    """UUID derived from content, lib3mf otherwise makes random ones so the same
+    mesh would never produce the same file twice"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part)
+    return str(uuid.UUID(bytes=h.digest()[:16], version=4))
+
+
+def write_3mf(meshes, path):
+    """Write meshes as a 3MF model with one object per mesh"""
+    wrapper = Lib3MF.Wrapper(os.path.join(os.path.dirname(Lib3MF.__file__), "lib3mf"))
+    model = wrapper.CreateModel()
+    model.SetUnit(Lib3MF.ModelUnit.MilliMeter)
+    object_uuids = []
+    for mesh in meshes:
+        vertices, triangles = _weld(mesh)
+        mesh_3mf = model.AddMeshObject()
+        object_uuids.append(_uuid(vertices.tobytes(), triangles.tobytes()))
+        mesh_3mf.SetUUID(object_uuids[-1])
+        mesh_3mf.SetGeometry(
+            (Lib3MF.Position * len(vertices)).from_buffer(vertices),
+            (Lib3MF.Triangle * len(triangles)).from_buffer(triangles),
+        )
+        if mesh.name:
+            mesh_3mf.SetName(mesh.name)
+        if mesh.color:
+            materials = model.AddBaseMaterialGroup()
+            material = materials.AddMaterial(
+                Name=str(mesh.color),
+                DisplayColor=wrapper.FloatRGBAToColor(*mesh.color),
+            )
+            mesh_3mf.SetObjectLevelProperty(materials.GetResourceID(), material)
+        item = model.AddBuildItem(mesh_3mf, wrapper.GetIdentityTransform())
+        item.SetUUID(_uuid(b"item", object_uuids[-1].encode()))
+    model.SetBuildUUID(_uuid(b"build", *(u.encode() for u in object_uuids)))
+    model.QueryWriter("3mf").WriteToFile(str(path))
+
+
+writers = {
+    ".stl": write_stl,
+    ".3mf": write_3mf,
+}
@@ -0,0 +1,95 @@
+"""Atomic, change aware writes into the export directory
+
+Every output is written to a temporary file next to its destination and only
+renamed over it if the content differs, so an interrupted run never leaves a
+half written file and unchanged outputs keep their modification times.
+"""
+
+import filecmp
+import json
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+from exporter import deps
+
+# Outputs of each module in each export directory as of the last export, used
+# to prune outputs of results that no longer exist
+manifest_path = deps.root / ".cache" / "export" / "outputs.json"
+
+# STEP headers carry the time they were written
+_step_timestamp = re.compile(rb"FILE_NAME\('[^']*','[^']*'")
+
+
+def _same(a, b):
+    if not (a.exists() and b.exists()):
+        return False
+    if a.suffix.lower() in [".step", ".stp"]:
+        return _step_timestamp.sub(b"", a.read_bytes()) == _step_timestamp.sub(
+            b"", b.read_bytes()
+        )
+    return filecmp.cmp(a, b, shallow=False)
+
+
+def commit(tmp, path):
+    """Move tmp over path unless they're the same, returns whether path changed"""
+    if _same(tmp, path):
+        tmp.unlink()
+        return False
+    os.replace(tmp, path)
+    return True
+
+
+@contextmanager
+def atomic_paths(paths):
+    """Temporary paths to write paths to, committed when the block succeeds
+
+    The temporary names keep the suffix, exporters pick the format from it.
+    """
+    tmps = [p.with_name(f".{p.stem}.{os.getpid()}.tmp{p.suffix}") for p in paths]
+    try:
+        yield tmps
+        for tmp, path in zip(tmps, paths):
+            if tmp.exists():
+                commit(tmp, path)
+    finally:
+        for tmp in tmps:
+            tmp.unlink(missing_ok=True)
+
+
+def _load_manifest():
+    try:
+        return json.loads(manifest_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def prune(export_dir, outputs):
+    """Delete outputs a module wrote before but not this time
+
+    outputs maps each module exported this run to the paths it produced.
+    Outputs of modules whose source file is gone are deleted too.
+    """
+    export_dir = Path(export_dir)
+    manifest = _load_manifest()
+    previous = manifest.get(str(export_dir.resolve()), {})
+    current = {
+        module: sorted(str(Path(p).relative_to(export_dir)) for p in paths)
+        for module, paths in outputs.items()
+    }
+    for module, files in previous.items():
+        if module in current:
+            stale = set(files) - set(current[module])
+        elif not deps.root.joinpath(*module.split(".")).with_suffix(".py").exists():
+            stale = set(files)
+        else:
+            current[module] = files
+            continue
+        for rel in stale:
+            print(f"Removing stale {export_dir / rel}")
+            (export_dir / rel).unlink(missing_ok=True)
+    manifest[str(export_dir.resolve())] = current
+    os.makedirs(manifest_path.parent, exist_ok=True)
+    with atomic_paths([manifest_path]) as (tmp,):
+        tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
@@ -0,0 +1,40 @@
+"""Progress lines with an ETA for running exports"""
+
+import time
+
+
+def _format_seconds(seconds):
+    minutes, seconds = divmod(round(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+class Progress:
+    """Prints a line as each task finishes
+
+    expected maps each module to the seconds all of its tasks are expected to
+    take, the ETA is whatever is left of that spread across the jobs.
+    """
+
+    def __init__(self, expected, jobs):
+        self._remaining = dict(expected)
+        self._jobs = jobs
+        self._start = time.monotonic()
+        self._done = 0
+        self._total = 0
+
+    def add(self, count=1):
+        self._total += count
+
+    def finished(self, module, task):
+        self._done += 1
+        self._remaining[module] = max(0, self._remaining[module] - task.seconds)
+        eta = sum(self._remaining.values()) / self._jobs
+        elapsed = time.monotonic() - self._start
+        print(
+            f"[{self._done}/{self._total} {_format_seconds(elapsed)} "
+            f"ETA {_format_seconds(eta)}] {task.name} ({task.seconds:.1f}s)"
+        )
+
+    def module_finished(self, module):
+        # History may have overestimated, nothing is left either way
+        self._remaining[module] = 0
@@ -0,0 +1,251 @@
+"""Running export tasks in worker pools
+
+Tasks are only handed to the pool when a worker is free and each worker
+reports when it picks one up, so the scheduler knows which process runs every
+task. That lets it kill the worker of a task that overran its timeout (the
+pool replaces it), retry failed tasks on a fresh pool and carry on past
+failures. With a memory budget tasks are admitted largest first, and only while
+the predicted memory use of everything running stays within the budget.
+
+Results are yielded in completion order, and each task's output can go to its
+own log file instead of interleaving with every other worker's.
+"""
+
+import os
+import queue
+import re
+import signal
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+
+# Seconds between checks for finished tasks, timeouts and cancellation
+poll_interval = 0.1
+
+
+class Cancelled(Exception):
+    """Export abandoned because newer changes arrived in watch mode"""
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+class Task:
+    """A call of fn(*args) in a worker, fn and args must be picklable
+
+    memory is the predicted peak RSS of the worker running it in MB. Once the
+    task ran, seconds is how long it took and log where its output went.
+    """
+
+    def __init__(self, name, fn, *args, memory=0):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.memory = memory
+        self.attempts = 0
+        self.seconds = None
+        self.log = None
+
+
+# Where workers report (task id, pid) when they start a task
+_started = None
+
+
+def _init_worker(started, initializer):
+    global _started
+    _started = started
+    if initializer is not None:
+        initializer()
+
+
+@contextmanager
+def _redirect_output(path):
+    """Send stdout and stderr to path, including output of OCCT's C++ code"""
+    if path is None:
+        yield
+        return
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    try:
+        with open(path, "w") as log:
+            os.dup2(log.fileno(), 1)
+            os.dup2(log.fileno(), 2)
+            yield
+            sys.stdout.flush()
+            sys.stderr.flush()
+    finally:
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        os.close(saved[0])
+        os.close(saved[1])
+
+
+def _call(fn, args, log):
+    with _redirect_output(log):
+        try:
+            return fn(*args)
+        except Exception:
+            traceback.print_exc()
+            raise
+
+
+def _run(task_id, fn, args, log):
+    _started.put((task_id, os.getpid()))
+    return _call(fn, args, log)
+
+
+class Scheduler:
+    """Runs tasks in a pool from ctx, or in this process if ctx is None
+
+    timeout is in seconds per task and needs a pool. Tasks failing more than
+    retries times, or timing out once, fail the whole run unless keep_going is
+    set, in which case they're collected in failures. memory_budget is in MB,
+    a task predicted to exceed it on its own still runs, just with nothing else
+    alongside.
+    Task output goes to a file per task in log_dir if given.
+    """
+
+    def __init__(
+        self,
+        jobs,
+        ctx=None,
+        initializer=None,
+        timeout=None,
+        retries=0,
+        keep_going=False,
+        max_tasks_per_child=None,
+        memory_budget=None,
+        log_dir=None,
+        cancel=None,
+    ):
+        self.jobs = jobs
+        self.failures = []
+        self._ctx = ctx
+        self._initializer = initializer
+        self._timeout = timeout
+        self._retries = retries
+        self._keep_going = keep_going
+        self._max_tasks_per_child = max_tasks_per_child
+        self._memory_budget = memory_budget
+        self._log_dir = log_dir
+        self._cancel = cancel
+        self._queue = []
+
+    def add(self, task):
+        if self._log_dir is not None:
+            name = re.sub(r"\W+", "-", task.name).strip("-")
+            task.log = self._log_dir / f"{name}.log"
+        self._queue.append(task)
+
+    def run(self):
+        """Yield (task, value) as each task succeeds, until none are left
+
+        Tasks can be added while iterating.
+        """
+        while self._queue:
+            retry = []
+            if self._ctx is None:
+                yield from self._run_in_process(retry)
+            else:
+                yield from self._run_pool(retry)
+            if retry:
+                print(f"Retrying {len(retry)} failed tasks with fresh workers")
+            self._queue = retry
+
+    def _check_cancel(self):
+        if self._cancel is not None and self._cancel.is_set():
+            raise Cancelled()
+
+    def _admit(self, running):
+        """Take the next task off the queue if it can start now"""
+        if not self._queue or len(running) >= self.jobs:
+            return None
+        if self._memory_budget is None:
+            return self._queue.pop(0)
+        # Largest first, so the biggest tasks don't end up running on their
+        # own at the end of the run
+        self._queue.sort(key=lambda t: t.memory, reverse=True)
+        in_use = sum(task.memory for task, _ in running.values())
+        if running and in_use + self._queue[0].memory > self._memory_budget:
+            return None
+        return self._queue.pop(0)
+
+    def _failed(self, task, error, retry):
+        task.attempts += 1
+        # A task that hung once hangs again, retrying only costs another timeout
+        if task.attempts <= self._retries and not isinstance(error, TaskTimeout):
+            print(f"Warning: {task.name} failed ({error!r}), retrying later")
+            retry.append(task)
+            return
+        if not self._keep_going:
+            raise error
+        print(f"Error: {task.name} failed: {error!r}")
+        if task.log is not None:
+            print(f"See {task.log} for details")
+        self.failures.append((task, error))
+
+    def _run_in_process(self, retry):
+        while self._queue:
+            self._check_cancel()
+            task = self._queue.pop(0)
+            start = time.monotonic()
+            try:
+                value = _call(task.fn, task.args, task.log)
+            except Exception as e:
+                self._failed(task, e, retry)
+                continue
+            task.seconds = time.monotonic() - start
+            yield task, value
+
+    def _run_pool(self, retry):
+        started = self._ctx.Queue()
+        pool = self._ctx.Pool(
+            self.jobs,
+            initializer=_init_worker,
+            initargs=(started, self._initializer),
+            maxtasksperchild=self._max_tasks_per_child,
+        )
+        with pool:
+            running = {}  # task id -> (task, AsyncResult)
+            workers = {}  # task id -> (pid, start time)
+            next_id = 0
+            while self._queue or running:
+                self._check_cancel()
+                while (task := self._admit(running)) is not None:
+                    r = pool.apply_async(_run, (next_id, task.fn, task.args, task.log))
+                    running[next_id] = (task, r)
+                    next_id += 1
+
+                next(iter(running.values()))[1].wait(poll_interval)
+                while True:
+                    try:
+                        task_id, pid = started.get_nowait()
+                    except queue.Empty:
+                        break
+                    if task_id in running:
+                        workers[task_id] = (pid, time.monotonic())
+
+                for task_id, (task, r) in list(running.items()):
+                    if r.ready():
+                        del running[task_id]
+                        _, start = workers.pop(task_id, (None, time.monotonic()))
+                        try:
+                            value = r.get()
+                        except Exception as e:
+                            self._failed(task, e, retry)
+                            continue
+                        task.seconds = time.monotonic() - start
+                        yield task, value
+                    elif (
+                        self._timeout is not None
+                        and task_id in workers
+                        and time.monotonic() - workers[task_id][1] > self._timeout
+                    ):
+                        # The pool starts a replacement for the killed worker
+                        os.kill(workers.pop(task_id)[0], signal.SIGKILL)
+                        del running[task_id]
+                        error = TaskTimeout(f"timed out after {self._timeout}s")
+                        self._failed(task, error, retry)
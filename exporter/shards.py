@@ -0,0 +1,59 @@
+"""Splitting modules into shards of roughly equal export time"""
+
+import heapq
+
+from exporter import deps
+
+# Rough seconds added by constructs that dominate build times, used for modules
+# that have never been exported on this machine. Booleans against the swept
+# profiles of threads make them the slowest of all, cached or not.
+_expensive = {
+    "cached_thread(": 30.0,
+    "Thread(": 15.0,
+    "import_step": 3.0,
+    "Text(": 2.0,
+    "fillet": 0.5,
+    "chamfer": 0.5,
+}
+
+# Seconds per KB of source, a stand in for everything else
+_per_kb = 0.2
+
+
+def static_cost(path):
+    """Estimated export seconds of the module at path from its sources"""
+    sources, _ = deps.transitive(path)
+    cost = 1.0
+    for source in sources:
+        text = source.read_text()
+        cost += len(text) / 1000 * _per_kb
+        # Shared code defines and wraps the expensive constructs rather than
+        # using them, it would add their cost to every module importing it
+        if source.relative_to(deps.root).parts[0] in deps.library_dirs:
+            continue
+        cost += sum(text.count(k) * s for k, s in _expensive.items())
+    return cost
+
+
+def cost(module, path, history):
+    """Export seconds of a module, from history if it has been exported"""
+    if module in history:
+        return history[module]["wall"]
+    return static_cost(path)
+
+
+def pack(export_args, n, history):
+    """Split (module, path) pairs into at most n shards with balanced costs
+
+    Longest processing time first: each module, most expensive first, goes to
+    the shard with the least work so far. Returns (cost, export_args) pairs.
+    """
+    costs = {module: cost(module, path, history) for module, path in export_args}
+    shards = [(0.0, i, []) for i in range(min(n, len(export_args)))]
+    for module, path in sorted(export_args, key=lambda a: costs[a[0]], reverse=True):
+        total, i, members = heapq.heappop(shards)
+        members.append((module, path))
+        heapq.heappush(shards, (total + costs[module], i, members))
+    return [
+        (total, members) for total, _, members in sorted(shards, key=lambda s: s[1])
+    ]
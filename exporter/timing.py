@@ -0,0 +1,108 @@
+"""Wall time, CPU time and peak memory of export phases
+
+Phases are recorded into a per process list and drained by the task that ran
+them, so nested export helpers don't need to pass anything around.
+"""
+
+import json
+import resource
+import sys
+import time
+from contextlib import contextmanager
+
+from exporter import cache
+
+# Where the timings of the last export are written
+report_path = cache.cache_dir / "timings.json"
+
+records = []
+
+# Phases that build geometry rather than convert or write it
+build_phases = ["import", "build"]
+
+
+def reset_peak_rss():
+    """Start measuring the peak resident memory afresh, where Linux allows it
+
+    Workers run one task after another, without this every task would report
+    the peak of the heaviest one the worker ran before it.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process since reset_peak_rss()
+
+    Where the peak can't be reset it's the peak over the process' lifetime.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / (1 << 10)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB everywhere else
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+@contextmanager
+def phase(name, export_type=None):
+    """Record the time and peak memory of the block, phases don't nest"""
+    reset_peak_rss()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        records.append(
+            {
+                "phase": name,
+                "format": export_type,
+                "wall": time.perf_counter() - wall,
+                "cpu": time.process_time() - cpu,
+                "peak_rss_mb": peak_rss_mb(),
+            }
+        )
+
+
+def drain(**context):
+    """Remove and return the recorded phases, tagged with context"""
+    drained = [context | r for r in records]
+    records.clear()
+    return drained
+
+
+def write(all_records, path):
+    with open(path, "w") as f:
+        json.dump(all_records, f, indent=2)
+
+
+def summary(all_records):
+    """Table of per module totals, slowest first"""
+    modules = {}
+    for r in all_records:
+        m = modules.setdefault(
+            r["module"], {"wall": 0, "cpu": 0, "build": 0, "export": 0, "rss": 0}
+        )
+        m["wall"] += r["wall"]
+        m["cpu"] += r["cpu"]
+        m["build" if r["phase"] in build_phases else "export"] += r["wall"]
+        m["rss"] = max(m["rss"], r["peak_rss_mb"])
+
+    width = max([len("Module")] + [len(m) for m in modules])
+    lines = [
+        f"{'Module':<{width}}  {'Wall (s)':>9}  {'CPU (s)':>9}  "
+        f"{'Build (s)':>10}  {'Export (s)':>10}  {'Peak RSS (MB)':>13}"
+    ]
+    for name, m in sorted(modules.items(), key=lambda i: i[1]["wall"], reverse=True):
+        lines.append(
+            f"{name:<{width}}  {m['wall']:>9.2f}  {m['cpu']:>9.2f}  "
+            f"{m['build']:>10.2f}  {m['export']:>10.2f}  {m['rss']:>13.0f}"
+        )
+    return "\n".join(lines)
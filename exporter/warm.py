@@ -0,0 +1,34 @@
+"""CAD kernels preloaded once by the forkserver
+
+Export workers are forked from the forkserver after these imports, so each of
+them starts with the kernels already loaded instead of importing them again.
+"""
+
+import time
+from importlib import import_module
+
+kernel_modules = [
+    "OCP",
+    "build123d",
+    "cadquery",
+    "bd_warehouse.thread",
+]
+
+# Seconds spent importing each preloaded module, inherited by every worker
+preload_seconds = {}
+
+
+def preload(modules):
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            import_module(name)
+        except Exception as e:
+            # Don't take down the forkserver, workers will hit the same error
+            # when they import it themselves
+            print(f"Warning: failed to preload {name}: {e}")
+            continue
+        preload_seconds[name] = time.perf_counter() - start
+
+
+preload(kernel_modules)
@@ -0,0 +1,13 @@
+"""Vitamins preloaded by the forkserver after the CAD kernels
+
+Importing vitamins pulls in their own dependencies and reads the measurements
+of their STEP models, so doing it once here spares every worker from it.
+export.py lists the vitamins the modules being exported actually use in
+EXPORT_WARM_VITAMINS.
+"""
+
+import os
+
+from exporter import warm
+
+warm.preload(filter(None, os.environ.get("EXPORT_WARM_VITAMINS", "").split(",")))
@@ -0,0 +1,140 @@
+"""Watch the working tree for changes to part sources and res/ assets
+
+Uses inotify on Linux and falls back to polling modification times elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from exporter import deps
+
+# Directories that never contain part sources or assets
+_ignored_dirs = ["export", "__pycache__"]
+
+# Wait this long without new events before reporting a batch of changes, so
+# editors writing several files (or a file several times) trigger one rebuild
+debounce = 0.3
+
+
+def _is_ignored(path):
+    rel = Path(path).relative_to(deps.root)
+    return any(p.startswith(".") or p in _ignored_dirs for p in rel.parts)
+
+
+def _is_relevant(path):
+    """Part sources, vitamins and res/ assets, the files exports depend on"""
+    if _is_ignored(path):
+        return False
+    rel = Path(path).relative_to(deps.root)
+    return rel.suffix == ".py" or rel.parts[0] == "res"
+
+
+def _watched_dirs():
+    for dirpath, dirnames, _ in os.walk(deps.root):
+        dirnames[:] = [
+            d for d in dirnames if not d.startswith(".") and d not in _ignored_dirs
+        ]
+        yield Path(dirpath)
+
+
+class _Inotify:
+    _event = struct.Struct("iIII")
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_ISDIR = 0x40000000
+    _mask = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}
+        for d in _watched_dirs():
+            self._add(d)
+
+    def _add(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self._mask)
+        if wd >= 0:
+            self._dirs[wd] = path
+
+    def read(self, timeout):
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return set()
+        changed = set()
+        buf = os.read(self._fd, 1 << 16)
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, length = self._event.unpack_from(buf, offset)
+            offset += self._event.size
+            name = buf[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if wd not in self._dirs or not name:
+                continue
+            path = self._dirs[wd] / os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and not _is_ignored(path):
+                    self._add(path)
+                continue
+            changed.add(path)
+        return changed
+
+
+class _Poller:
+    interval = 1
+
+    def __init__(self):
+        self._mtimes = self._scan()
+
+    def _scan(self):
+        mtimes = {}
+        for d in _watched_dirs():
+            for f in d.iterdir():
+                if f.is_file() and _is_relevant(f):
+                    mtimes[f] = f.stat().st_mtime_ns
+        return mtimes
+
+    def read(self, timeout):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        mtimes = self._scan()
+        changed = {
+            f
+            for f in self._mtimes.keys() | mtimes.keys()
+            if self._mtimes.get(f) != mtimes.get(f)
+        }
+        self._mtimes = mtimes
+        return changed
+
+
+class Watcher:
+    def __init__(self):
+        try:
+            self._backend = _Inotify() if sys.platform == "linux" else _Poller()
+        except OSError as e:
+            print(f"Warning: inotify unavailable ({e}), polling for changes")
+            self._backend = _Poller()
+
+    def changes(self, timeout=None):
+        """Relevant paths changed within timeout seconds (None waits forever)"""
+        changed = set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not changed:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return changed
+            changed = {p for p in self._backend.read(remaining) if _is_relevant(p)}
+        # Keep collecting until things settle down
+        while True:
+            more = {p for p in self._backend.read(debounce) if _is_relevant(p)}
+            if not more:
+                return changed
+            changed |= more
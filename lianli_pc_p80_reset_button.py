@@ -3,6 +3,8 @@
 from build123d import *
 import logging
 
+from lib.preview import chamfer
+
 clearance = 0.3
 
 collar_dia = 8.8
@@ -0,0 +1,54 @@
+"""Batched boolean operations
+
+Chains like `body += a`, `body += b`, `body -= c` run a boolean per step, and
+each step intersects its tool with everything built so far, so long chains
+such as line for line OpenSCAD translations get slow. union and difference
+take all the shapes at once and run a single OCCT boolean, which intersects
+every pair of shapes only once.
+
+Consecutive additions can be collected into one union, and consecutive
+subtractions into one difference: (a - b) - c is a - (b + c).
+"""
+
+from build123d import Part
+from build123d.topology import downcast
+from OCP.BRepAlgoAPI import BRepAlgoAPI_Cut, BRepAlgoAPI_Fuse
+from OCP.TopTools import TopTools_ListOfShape
+
+# Use OCCT's multithreaded boolean mode
+parallel = True
+
+
+def _shapes(shapes):
+    result = TopTools_ListOfShape()
+    for shape in shapes:
+        result.Append(shape.wrapped)
+    return result
+
+
+def _boolean(operation, arguments, tools):
+    # Empty shapes like Part() are skipped, and like build123d's operators
+    # nothing to add or remove leaves the shape as it is
+    tools = [t for t in tools if t.wrapped is not None]
+    if not tools:
+        return arguments[0]
+    operation.SetArguments(_shapes(arguments))
+    operation.SetTools(_shapes(tools))
+    operation.SetRunParallel(parallel)
+    operation.Build()
+    if not operation.IsDone():
+        raise RuntimeError(f"{type(operation).__name__} of {len(tools)} tools failed")
+    return Part(downcast(operation.Shape())).clean()
+
+
+def union(*shapes):
+    """All of shapes fused in one operation"""
+    shapes = [s for s in shapes if s.wrapped is not None]
+    if not shapes:
+        return Part()
+    return _boolean(BRepAlgoAPI_Fuse(), shapes[:1], shapes[1:])
+
+
+def difference(shape, *tools):
+    """shape with all of tools cut away in one operation"""
+    return _boolean(BRepAlgoAPI_Cut(), [shape], tools)
@@ -0,0 +1,40 @@
+"""Hashes for cache keys shared by the export and memo caches
+
+Anything that changes the result of building or exporting a part has to be
+part of its key: the content of the files it reads and the versions of the CAD
+toolchain doing the work.
+"""
+
+import hashlib
+import sys
+from functools import cache
+from importlib import metadata
+
+toolchain_packages = [
+    "build123d",
+    "cadquery",
+    "cadquery-ocp",
+    "bd_warehouse",
+    "lib3mf",
+    "numpy",
+]
+
+
+@cache
+def toolchain_versions():
+    versions = {"python": sys.version}
+    for package in toolchain_packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+@cache
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,300 @@
+"""Disk backed memoization for parametric builders
+
+Results of decorated builders are pickled to .cache/memo, with shapes stored
+as OCCT binary BREP. Entries are keyed by the builder's name, the sources and
+res/ assets its module depends on, the CAD toolchain versions, whether it's a
+preview and the arguments, so any of those changing means a rebuild.
+
+The cache is shared between processes: entries are written atomically, and a
+lock per entry makes concurrent export workers needing the same result build
+it only once. The least recently used entries are removed once the cache grows
+past max_size.
+"""
+
+import copyreg
+import fcntl
+import functools
+import hashlib
+import io
+import json
+import os
+import pickle
+import tempfile
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+
+from build123d.persistence import serialize_shape
+from build123d.topology import downcast
+from OCP.BinTools import BinTools, BinTools_FormatVersion_CURRENT
+from OCP.gp import gp_Trsf
+from OCP.TopLoc import TopLoc_Location
+from OCP.TopoDS import (
+    TopoDS_Compound,
+    TopoDS_CompSolid,
+    TopoDS_Edge,
+    TopoDS_Face,
+    TopoDS_Shape,
+    TopoDS_Shell,
+    TopoDS_Solid,
+    TopoDS_Vertex,
+    TopoDS_Wire,
+)
+
+from exporter import deps
+from lib import fingerprint, preview
+
+cache_dir = deps.root / ".cache" / "memo"
+_exporter_dir = deps.root / "exporter"
+
+# Bytes of pickled results kept before the least recently used get removed
+max_size = 1 << 30
+
+# Bump when the layout of cache entries changes
+_format = "2"
+
+
+def _location(matrix):
+    trsf = gp_Trsf()
+    trsf.SetValues(*matrix)
+    return TopLoc_Location(trsf)
+
+
+def _reduce_location(location):
+    # build123d pickles locations as single precision floats, which would move
+    # joints of cached parts ever so slightly
+    trsf = location.Transformation()
+    return _location, ([trsf.Value(r, c) for r in range(1, 4) for c in range(1, 5)],)
+
+
+def _shape(data):
+    # OCP fails to read some valid binary BREP from Python streams, reading
+    # the same bytes from a file works
+    with tempfile.NamedTemporaryFile(suffix=".brep") as f:
+        f.write(data)
+        f.flush()
+        shape = TopoDS_Shape()
+        BinTools.Read_s(shape, f.name)
+    return downcast(shape)
+
+
+def _reduce_shape(shape):
+    return _shape, (serialize_shape(shape),)
+
+
+def _brep(shape):
+    f = io.BytesIO()
+    BinTools.Write_s(shape, f, False, False, BinTools_FormatVersion_CURRENT)
+    return f.getvalue()
+
+
+def _reduce_shape_key(shape):
+    # Without triangulations, which depend on what was done with the shape
+    return _shape, (_brep(shape),)
+
+
+_shape_types = (
+    TopoDS_Shape,
+    TopoDS_Compound,
+    TopoDS_CompSolid,
+    TopoDS_Solid,
+    TopoDS_Shell,
+    TopoDS_Face,
+    TopoDS_Wire,
+    TopoDS_Edge,
+    TopoDS_Vertex,
+)
+
+_reducers = {TopLoc_Location: _reduce_location} | {
+    cls: _reduce_shape for cls in _shape_types
+}
+
+
+def _dumps(value):
+    f = io.BytesIO()
+    pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = copyreg.dispatch_table | _reducers
+    pickler.dump(value)
+    return f.getvalue()
+
+
+# Shapes returned by memoized builders, by id: a weak reference to the shape,
+# the key of the entry it came from, the OCCT shape it had then and the shapes
+# among its attributes
+_origins = {}
+
+
+def _is_shape(value):
+    return isinstance(getattr(value, "wrapped", None), TopoDS_Shape)
+
+
+def _tag(value, key):
+    """Remember that value is the result stored under key"""
+    if not _is_shape(value):
+        return
+    try:
+        ref = weakref.ref(value)
+    except TypeError:
+        return
+    parts = {k: v for k, v in vars(value).items() if k != "wrapped" and _is_shape(v)}
+    _origins[id(value)] = (ref, key, value.wrapped, parts)
+    weakref.finalize(value, _origins.pop, id(value), None)
+
+
+def _from_entry(key, location, orientation):
+    """Stands for a memoized shape in keys, never actually called"""
+    raise NotImplementedError
+
+
+class _KeyPickler(pickle.Pickler):
+    """Pickles the same arguments to the same bytes
+
+    The BREP of a shape depends on how it came about, a freshly built result
+    and the same result loaded from the cache are written differently. Results
+    of memoized builders are pickled as the key they're stored under instead,
+    along with where they've been moved to and attributes changed since.
+    """
+
+    dispatch_table = (
+        copyreg.dispatch_table
+        | _reducers
+        | {cls: _reduce_shape_key for cls in _shape_types}
+    )
+
+    def reducer_override(self, obj):
+        origin = _origins.get(id(obj))
+        if origin is None or origin[0]() is not obj:
+            return NotImplemented
+        _, key, wrapped, parts = origin
+        # Still the same geometry, however it was moved or copied since
+        if obj.wrapped is None or not obj.wrapped.IsPartner(wrapped):
+            return NotImplemented
+        location = _reduce_location(obj.wrapped.Location())[1]
+        orientation = int(obj.wrapped.Orientation())
+        state = {
+            k: v
+            for k, v in vars(obj).items()
+            if k != "wrapped" and parts.get(k) is not v
+        }
+        return _from_entry, (key, location, orientation), state
+
+
+def _key(fn, args, kwargs):
+    path = Path(fn.__code__.co_filename)
+    sources, assets = deps.transitive(path)
+    h = hashlib.sha256()
+    h.update(_format.encode())
+    h.update(f"{fn.__module__}.{fn.__qualname__}".encode())
+    h.update(json.dumps(fingerprint.toolchain_versions(), sort_keys=True).encode())
+    # Builders using simplified features in previews return something else
+    h.update(str(preview.enabled()).encode())
+    for f in sorted(sources | assets):
+        # Only found through this module's own imports, the export code
+        # doesn't affect what builders return
+        if _exporter_dir in f.parents:
+            continue
+        h.update(str(f.relative_to(deps.root)).encode())
+        h.update(fingerprint.file_hash(f).encode())
+    f = io.BytesIO()
+    _KeyPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(
+        (args, sorted(kwargs.items()))
+    )
+    h.update(f.getvalue())
+    return h.hexdigest()
+
+
+@contextmanager
+def _locked(path):
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _load(entry):
+    """The value stored in entry, or raise KeyError"""
+    try:
+        data = entry.read_bytes()
+    except FileNotFoundError:
+        raise KeyError(entry.name) from None
+    try:
+        value = pickle.loads(data)
+    except Exception as e:
+        print(f"Warning: ignoring unreadable cache entry {entry}: {e!r}")
+        raise KeyError(entry.name) from None
+    # Recently used as far as eviction is concerned
+    os.utime(entry)
+    return value
+
+
+def _store(entry, value):
+    try:
+        data = _dumps(value)
+    except Exception as e:
+        print(f"Warning: can't cache result of type {type(value).__name__}: {e!r}")
+        return
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=cache_dir)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, entry)
+
+
+def _evict():
+    """Remove the least recently used entries until the cache fits max_size"""
+    with _locked(cache_dir / ".lock"):
+        entries = []
+        for entry in cache_dir.glob("*.pickle"):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= max_size:
+                break
+            entry.unlink(missing_ok=True)
+            # A process waiting on this lock may then build the entry at the
+            # same time as another one, the atomic writes keep that harmless
+            entry.with_suffix(".lock").unlink(missing_ok=True)
+            total -= size
+
+
+def _lookup(fn, key, args, kwargs):
+    entry = cache_dir / f"{key}.pickle"
+    try:
+        return _load(entry)
+    except KeyError:
+        pass
+    os.makedirs(cache_dir, exist_ok=True)
+    with _locked(entry.with_suffix(".lock")):
+        # Another process may have built it while this one waited
+        try:
+            return _load(entry)
+        except KeyError:
+            pass
+        value = fn(*args, **kwargs)
+        _store(entry, value)
+    _evict()
+    return value
+
+
+def memoize(fn):
+    """Cache results of fn on disk, fn must be a pure function of its arguments
+
+    Arguments have to be picklable, shapes and lists of them included. Every
+    call returns a fresh copy, so callers are free to modify the result.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = _key(fn, args, kwargs)
+        value = _lookup(fn, key, args, kwargs)
+        # So memoized builders taking this result as an argument get the same
+        # key for it whether it was just built or loaded
+        _tag(value, key)
+        return value
+
+    return wrapper
@@ -0,0 +1,295 @@
+"""OpenSCAD style CSG for translations of SCAD parts
+
+Translating a SCAD file line for line gives long chains like `body += a` and
+`body -= b`, which cost a boolean per line when run directly on shapes. Here
+cube(), cylinder(), translate() and rotate() build a lazy CSG tree instead,
+and build() optimizes it before evaluating it with lib.csg:
+
+- Nested unions, and differences of differences, are flattened so each runs
+  as a single boolean
+- Subtractions are hoisted out of unions when their tools are clear of every
+  other member, so they join the enclosing difference
+- Tools whose bounding box misses the shape they're cut from are dropped
+- Identical primitives are built once, and duplicates of a member of a union
+  or difference are left out
+
+Other build123d shapes, such as extruded text, can be added to or subtracted
+from the tree as they are.
+"""
+
+from build123d import (
+    Align,
+    BuildPart,
+    BuildSketch,
+    Box,
+    BoundBox,
+    Cone,
+    Cylinder,
+    Extrinsic,
+    Location,
+    Part,
+    RegularPolygon,
+    Shape,
+    extrude,
+)
+
+from lib import csg
+
+# Evaluated subtrees by their key, along with the node so the shapes that
+# leaves are keyed by stay alive. Only kept while a tree is being built, so
+# workers exporting one module after another don't hold on to them.
+_built = {}
+
+
+def _location_key(location):
+    trsf = location.wrapped.Transformation()
+    return tuple(trsf.Value(r, c) for r in range(1, 4) for c in range(1, 5))
+
+
+def _disjoint(a, b):
+    """Whether the bounding boxes of nodes a and b are clear of each other"""
+    return a.bounding_box().wrapped.IsOut(b.bounding_box().wrapped)
+
+
+def _node(value):
+    return value if isinstance(value, Node) else Leaf(value)
+
+
+def _unique(nodes):
+    seen = set()
+    result = []
+    for node in nodes:
+        if node.key not in seen:
+            seen.add(node.key)
+            result.append(node)
+    return result
+
+
+class Node:
+    """A lazily evaluated solid, combine with + and - like build123d shapes"""
+
+    _bounding_box = None
+
+    def __add__(self, other):
+        return Union([self, _node(other)])
+
+    def __sub__(self, other):
+        return Difference(self, [_node(other)])
+
+    def bounding_box(self):
+        if self._bounding_box is None:
+            self._bounding_box = self._bounds()
+        return self._bounding_box
+
+    def build(self):
+        """Optimize the tree and evaluate it, returning a Part"""
+        try:
+            return self._optimized()._evaluate()
+        finally:
+            _built.clear()
+
+    def _evaluate(self):
+        if self.key not in _built:
+            _built[self.key] = (self, self._shape())
+        return _built[self.key][1]
+
+
+class Leaf(Node):
+    """A build123d shape, moved rather than rebuilt by transforms"""
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.key = ("shape", id(shape))
+
+    def moved(self, location):
+        return Leaf(location * self.shape)
+
+    def _bounds(self):
+        return self.shape.bounding_box(optimal=False)
+
+    def _optimized(self):
+        return self
+
+    def _shape(self):
+        return self.shape
+
+
+class Primitive(Node):
+    """A cube or cylinder at location"""
+
+    def __init__(self, kind, params, location):
+        self.kind = kind
+        self.params = params
+        self.location = location
+        self.key = (kind, params, _location_key(location))
+
+    def moved(self, location):
+        return Primitive(self.kind, self.params, location * self.location)
+
+    def _bounds(self):
+        return self._evaluate().bounding_box(optimal=False)
+
+    def _optimized(self):
+        return self
+
+    def _shape(self):
+        # Placed copies of the same primitive share its geometry
+        unplaced = ("unplaced", self.kind, self.params)
+        if unplaced not in _built:
+            _built[unplaced] = (self, _primitives[self.kind](*self.params))
+        return self.location * _built[unplaced][1]
+
+
+class Union(Node):
+    def __init__(self, members):
+        self.members = members
+        self.key = ("union",) + tuple(m.key for m in members)
+
+    def moved(self, location):
+        return Union([m.moved(location) for m in self.members])
+
+    def _bounds(self):
+        bbox = self.members[0].bounding_box()
+        for member in self.members[1:]:
+            bbox = bbox.add(member.bounding_box())
+        return bbox
+
+    def _optimized(self):
+        members = []
+        for member in self.members:
+            member = member._optimized()
+            if isinstance(member, Union):
+                members.extend(member.members)
+            else:
+                members.append(member)
+        members = _unique(members)
+        if not members:
+            return self
+
+        # (a - t) + b is (a + b) - t as long as t is clear of b
+        hoisted = []
+        for i, member in enumerate(members):
+            if not isinstance(member, Difference):
+                continue
+            others = members[:i] + members[i + 1 :]
+            clear = [t for t in member.tools if all(_disjoint(t, o) for o in others)]
+            if clear:
+                hoisted.extend(clear)
+                kept = [t for t in member.tools if t not in clear]
+                members[i] = Difference(member.base, kept) if kept else member.base
+        union = members[0] if len(members) == 1 else Union(members)
+        return Difference(union, hoisted)._optimized() if hoisted else union
+
+    def _shape(self):
+        if not self.members:
+            return Part()
+        return csg.union(*(m._evaluate() for m in self.members))
+
+
+class Difference(Node):
+    def __init__(self, base, tools):
+        self.base = base
+        self.tools = tools
+        self.key = ("difference", base.key) + tuple(t.key for t in tools)
+
+    def moved(self, location):
+        return Difference(
+            self.base.moved(location), [t.moved(location) for t in self.tools]
+        )
+
+    def _bounds(self):
+        return self.base.bounding_box()
+
+    def _optimized(self):
+        base = self.base._optimized()
+        if isinstance(base, Union) and not base.members:
+            return base
+        tools = []
+        if isinstance(base, Difference):
+            # (a - b) - c is a - (b + c)
+            tools.extend(base.tools)
+            base = base.base
+        for tool in self.tools:
+            tool = tool._optimized()
+            if isinstance(tool, Union):
+                tools.extend(tool.members)
+            else:
+                tools.append(tool)
+        tools = [t for t in _unique(tools) if not _disjoint(t, base)]
+        return Difference(base, tools) if tools else base
+
+    def _shape(self):
+        return csg.difference(
+            self.base._evaluate(), *(t._evaluate() for t in self.tools)
+        )
+
+
+def _cube(size, center):
+    align = Align.CENTER if center else Align.MIN
+    return Box(*size, align=align)
+
+
+def _cylinder(h, r1, r2, center, fn):
+    align = (Align.CENTER, Align.CENTER, Align.CENTER if center else Align.MIN)
+    if fn is not None:
+        # Like OpenSCAD's $fn, a regular prism in the cylinder's circle
+        with BuildPart() as part:
+            with BuildSketch():
+                RegularPolygon(r1, fn, align=None)
+            extrude(amount=h)
+        return part.part.moved(Location((0, 0, -h / 2 if center else 0)))
+    if r2 != r1:
+        return Cone(height=h, bottom_radius=r1, top_radius=r2, align=align)
+    return Cylinder(height=h, radius=r1, align=align)
+
+
+_primitives = {"cube": _cube, "cylinder": _cylinder}
+
+
+def cube(size, center=False):
+    """OpenSCAD's cube(), size is a number or [x, y, z]"""
+    if not isinstance(size, (list, tuple)):
+        size = [size] * 3
+    return Primitive("cube", (tuple(size), center), Location())
+
+
+def cylinder(h, r1=None, r2=None, r=None, center=False, fn=None):
+    """OpenSCAD's cylinder(), fn gives a prism with that many sides"""
+    r1 = r if r1 is None else r1
+    r2 = r1 if r2 is None else r2
+    if fn is not None and r2 != r1:
+        raise ValueError("Only cylinders with one radius can have fn sides")
+    return Primitive("cylinder", (h, r1, r2, center, fn), Location())
+
+
+def union(*children):
+    """OpenSCAD's union(), of nothing at all if no children are given"""
+    return Union([_node(c) for c in children])
+
+
+class Transform:
+    """A transform that applies to nodes and shapes with *, like Location"""
+
+    def __init__(self, location):
+        self.location = location
+
+    def __mul__(self, other):
+        if isinstance(other, Transform):
+            return Transform(self.location * other.location)
+        if isinstance(other, Node):
+            return other.moved(self.location)
+        if isinstance(other, Shape):
+            return self.location * other
+        return NotImplemented
+
+
+def translate(v):
+    """OpenSCAD's translate()"""
+    return Transform(Location(tuple(v)))
+
+
+def rotate(a):
+    """OpenSCAD's rotate(), by a degrees around Z or [x, y, z] in that order"""
+    if not isinstance(a, (list, tuple)):
+        a = [0, 0, a]
+    return Transform(Location((0, 0, 0), tuple(a), Extrinsic.XYZ))
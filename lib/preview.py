@@ -0,0 +1,127 @@
+"""Simplified geometry for fast preview exports
+
+With EXPORT_PREVIEW set, which `export.py --preview` does, the expensive
+features parts are made of get replaced by cheap approximations:
+
+- Threads become plain tubes between their root and pitch diameters
+- Fillets and chamfers of edges up to small_feature are skipped
+- Text becomes its approximate bounding rectangle
+
+Part modules opt in by importing fillet, chamfer and Text from here after
+`from build123d import *`. Threads built with lib.threads honour it already.
+"""
+
+import os
+
+import build123d
+from build123d import (
+    Align,
+    Builder,
+    Compound,
+    Edge,
+    Mode,
+    Part,
+    Rectangle,
+    Solid,
+    TextAlign,
+)
+from build123d.build_common import flatten_sequence
+
+from lib import text
+
+# Fillets and chamfers up to this size in mm are left out of previews
+small_feature = 2.0
+
+# Rough size of a character relative to the font size, for text previews
+_char_width = 0.6
+_cap_height = 0.7
+
+
+def enabled():
+    return os.environ.get("EXPORT_PREVIEW", "") not in ("", "0")
+
+
+def _skipped(objects, size):
+    """Whether a fillet or chamfer of size on objects is left out"""
+    if not enabled() or size > small_feature:
+        return False
+    # Sketch and line fillets of vertices are cheap, only skip the 3D ones
+    return all(isinstance(o, Edge) for o in flatten_sequence(objects))
+
+
+def _unchanged(objects):
+    """What fillet or chamfer return when they leave the part as it is"""
+    context = Builder._get_context(log=False)
+    if context is not None:
+        return Part(context._obj.wrapped)
+    return Part(flatten_sequence(objects)[0].topo_parent.wrapped)
+
+
+def fillet(objects, radius):
+    """build123d's fillet, skipping small fillets of edges in previews"""
+    if _skipped(objects, radius):
+        return _unchanged(objects)
+    return build123d.fillet(objects, radius)
+
+
+def chamfer(objects, length, length2=None, angle=None, reference=None):
+    """build123d's chamfer, skipping small chamfers of edges in previews"""
+    if _skipped(objects, max(length, length2 or 0)):
+        return _unchanged(objects)
+    return build123d.chamfer(objects, length, length2, angle, reference)
+
+
+_text_align = {
+    TextAlign.LEFT: Align.MIN,
+    TextAlign.CENTER: Align.CENTER,
+    TextAlign.RIGHT: Align.MAX,
+    TextAlign.BOTTOM: Align.MIN,
+    TextAlign.TOP: Align.MAX,
+    TextAlign.TOPFIRSTLINE: Align.MAX,
+}
+
+
+def Text(
+    txt,
+    font_size,
+    *args,
+    text_align=(TextAlign.CENTER, TextAlign.CENTER),
+    align=None,
+    rotation=0.0,
+    mode=Mode.ADD,
+    **kwargs,
+):
+    """lib.text's Text, or a rectangle about its size in previews"""
+    if not enabled():
+        return text.Text(
+            txt,
+            font_size,
+            *args,
+            text_align=text_align,
+            align=align,
+            rotation=rotation,
+            mode=mode,
+            **kwargs,
+        )
+    lines = txt.splitlines() or [""]
+    width = max(len(line) for line in lines) * font_size * _char_width
+    height = (len(lines) - 1) * font_size + font_size * _cap_height
+    if align is None:
+        align = tuple(_text_align[a] for a in text_align)
+    return Rectangle(width, height, rotation=rotation, align=align, mode=mode)
+
+
+def thread(cls, **params):
+    """Stand-in for cls(**params), a bd_warehouse thread
+
+    It has all the attributes of the real thread, but its shape is a tube
+    between the root and pitch radii over the thread's length.
+    """
+    stand_in = cls(**params, simple=True)
+    pitch_radius = (stand_in.apex_radius + stand_in.root_radius) / 2
+    inner, outer = sorted([pitch_radius, stand_in.root_radius])
+    tube = Solid.make_cylinder(outer, stand_in.length).cut(
+        Solid.make_cylinder(inner, stand_in.length)
+    )
+    stand_in.wrapped = Compound([tube]).wrapped
+    return stand_in
@@ -0,0 +1,155 @@
+"""Binary BREP cache for STEP models
+
+Parsing STEP is slow, so the first import of a STEP file writes its shapes to
+OCCT's binary BREP format next to a small JSON description of the labels,
+colors and assembly structure build123d's import_step reads from it. Later
+imports, in this process or any other, load from there instead. Entries are
+keyed by the STEP file's content hash, so editing the file invalidates them.
+
+Vitamins mostly get used for a few dimensions measured from their STEP model,
+measurements() keeps those in a JSON sidecar so the model itself only has to
+be loaded when its geometry is needed.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from importlib import metadata
+from pathlib import Path
+
+from OCP.BinTools import BinTools
+from OCP.BRep import BRep_Builder
+from OCP.gp import gp_Trsf
+from OCP.TopoDS import TopoDS_Compound, TopoDS_Iterator
+from build123d import Color, Compound, Location
+from build123d import import_step as _import_step
+from build123d.topology import downcast
+
+cache_dir = Path(__file__).parent.parent / ".cache" / "step"
+
+# Bump when the layout of cache entries changes
+_format = "1"
+
+
+def _key(path):
+    h = hashlib.sha256()
+    h.update(_format.encode())
+    h.update(metadata.version("cadquery-ocp").encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _describe(node, leaves):
+    """JSON friendly description of node, appending its leaf shapes to leaves"""
+    desc = {
+        "label": node.label,
+        "color": list(tuple(node.color)) if node.color is not None else None,
+    }
+    if node.children:
+        trsf = node.location.wrapped.Transformation()
+        desc["location"] = [
+            [trsf.Value(r, c) for c in range(1, 5)] for r in range(1, 4)
+        ]
+        desc["children"] = [_describe(child, leaves) for child in node.children]
+    else:
+        desc["leaf"] = len(leaves)
+        leaves.append(node.wrapped)
+    return desc
+
+
+def _rebuild(desc, leaves):
+    """Inverse of _describe, following the same steps as import_step"""
+    if "children" in desc:
+        node = Compound()
+        node.children = [_rebuild(child, leaves) for child in desc["children"]]
+        trsf = gp_Trsf()
+        trsf.SetValues(*(v for row in desc["location"] for v in row))
+        node.move(Location(trsf))
+    else:
+        # Compound.cast wraps any kind of shape in the matching class
+        node = Compound.cast(leaves[desc["leaf"]])
+    node.color = Color(*desc["color"]) if desc["color"] is not None else None
+    node.label = desc["label"]
+    return node
+
+
+def _write(path, write):
+    """Write a file through a temporary one so readers never see it partial"""
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=path.parent)
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def _store(entry, shape):
+    leaves = []
+    desc = _describe(shape, leaves)
+    compound = TopoDS_Compound()
+    builder = BRep_Builder()
+    builder.MakeCompound(compound)
+    for leaf in leaves:
+        builder.Add(compound, leaf)
+    os.makedirs(cache_dir, exist_ok=True)
+    _write(entry.with_suffix(".brep"), lambda tmp: BinTools.Write_s(compound, tmp))
+    # The description goes last, an entry only counts once it exists
+    _write(
+        entry.with_suffix(".json"),
+        lambda tmp: Path(tmp).write_text(json.dumps(desc)),
+    )
+
+
+def _load(entry):
+    try:
+        desc = json.loads(entry.with_suffix(".json").read_text())
+    except FileNotFoundError:
+        return None
+    compound = TopoDS_Compound()
+    BinTools.Read_s(compound, str(entry.with_suffix(".brep")))
+    leaves = []
+    it = TopoDS_Iterator(compound)
+    while it.More():
+        leaves.append(downcast(it.Value()))
+        it.Next()
+    return _rebuild(desc, leaves)
+
+
+def measurements(filename, source, measure):
+    """measure() of the STEP model in filename, from a sidecar when possible
+
+    measure returns a dict of JSON values, and source is the file defining it.
+    The sidecar is keyed by the contents of both, editing either remeasures.
+    """
+    h = hashlib.sha256()
+    h.update(_key(filename).encode())
+    h.update(metadata.version("build123d").encode())
+    h.update(Path(source).read_bytes())
+    sidecar = cache_dir / f"{h.hexdigest()}.measurements.json"
+    try:
+        return json.loads(sidecar.read_text())
+    except FileNotFoundError:
+        pass
+    values = measure()
+    os.makedirs(cache_dir, exist_ok=True)
+    _write(sidecar, lambda tmp: Path(tmp).write_text(json.dumps(values)))
+    return values
+
+
+def import_step(filename):
+    """build123d's import_step, loading from the BREP cache when possible"""
+    entry = cache_dir / _key(filename)
+    shape = _load(entry)
+    if shape is None:
+        shape = _import_step(filename)
+        # Unreadable files, like Git LFS pointers that were never fetched,
+        # import as an empty compound
+        if shape.wrapped is None:
+            raise ValueError(f"No shapes in STEP file {filename}")
+        _store(entry, shape)
+    return shape
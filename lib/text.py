@@ -0,0 +1,195 @@
+"""Text built from cached glyph faces
+
+build123d's Text converts the outline of every glyph to faces each time it's
+called. Here each glyph is converted once per process, keyed by font, size,
+style and character, and text is laid out from located copies of the cached
+glyphs with the same formatter OCCT uses, so the faces are identical to
+build123d's. Aligned text is placed using the cached bounding boxes of its
+glyphs too, bounding the finished text takes longer than laying it out.
+
+Glyphs aren't cached on disk, converting one is quicker than loading it back.
+Parts with a lot of text are better memoized as a whole with lib.memo.
+"""
+
+import os
+import sys
+from functools import cache
+
+import build123d
+from build123d import (
+    BaseSketchObject,
+    BuildSketch,
+    Compound,
+    FontStyle,
+    Location,
+    Mode,
+    TextAlign,
+    Vector,
+)
+from build123d.build_common import validate_inputs
+from build123d.geometry import to_align_offset
+from build123d.topology.utils import tuplify
+from OCP.Font import (
+    Font_FA_Bold,
+    Font_FA_BoldItalic,
+    Font_FA_Italic,
+    Font_FA_Regular,
+    Font_FontMgr,
+    Font_SystemFont,
+    Font_TextFormatter,
+)
+from OCP.Graphic3d import (
+    Graphic3d_HTA_CENTER,
+    Graphic3d_HTA_LEFT,
+    Graphic3d_HTA_RIGHT,
+    Graphic3d_VTA_BOTTOM,
+    Graphic3d_VTA_CENTER,
+    Graphic3d_VTA_TOP,
+    Graphic3d_VTA_TOPFIRSTLINE,
+)
+from OCP.NCollection import NCollection_Utf8String
+from OCP.StdPrs import StdPrs_BRepFont
+from OCP.TCollection import TCollection_AsciiString
+
+_font_kind = {
+    FontStyle.REGULAR: Font_FA_Regular,
+    FontStyle.BOLD: Font_FA_Bold,
+    FontStyle.ITALIC: Font_FA_Italic,
+    FontStyle.BOLDITALIC: Font_FA_BoldItalic,
+}
+
+_horizontal = {
+    TextAlign.LEFT: Graphic3d_HTA_LEFT,
+    TextAlign.CENTER: Graphic3d_HTA_CENTER,
+    TextAlign.RIGHT: Graphic3d_HTA_RIGHT,
+}
+
+_vertical = {
+    TextAlign.BOTTOM: Graphic3d_VTA_BOTTOM,
+    TextAlign.CENTER: Graphic3d_VTA_CENTER,
+    TextAlign.TOP: Graphic3d_VTA_TOP,
+    TextAlign.TOPFIRSTLINE: Graphic3d_VTA_TOPFIRSTLINE,
+}
+
+
+@cache
+def _font(font, font_path, font_style, font_size):
+    """The OCCT font, found the same way build123d's make_text does"""
+    if sys.platform.startswith("linux"):
+        os.environ["FONTCONFIG_FILE"] = "/etc/fonts/fonts.conf"
+        os.environ["FONTCONFIG_PATH"] = "/etc/fonts/"
+    kind = _font_kind[font_style]
+    mgr = Font_FontMgr.GetInstance_s()
+    if font_path and mgr.CheckFont(TCollection_AsciiString(font_path).ToCString()):
+        font_t = Font_SystemFont(TCollection_AsciiString(font_path))
+        font_t.SetFontPath(kind, TCollection_AsciiString(font_path))
+        mgr.RegisterFont(font_t, True)
+    else:
+        font_t = mgr.FindFont(TCollection_AsciiString(font), kind)
+    return StdPrs_BRepFont(
+        NCollection_Utf8String(font_t.FontName().ToCString()), kind, float(font_size)
+    )
+
+
+@cache
+def _glyph(font, font_path, font_style, font_size, char):
+    """Faces of char placed at the origin and their bounding box, or None"""
+    shape = _font(font, font_path, font_style, font_size).RenderGlyph(char)
+    if shape.IsNull():
+        return None
+    faces = Compound(shape)
+    return faces, faces.bounding_box()
+
+
+def make_text(
+    txt,
+    font_size,
+    font="Arial",
+    font_path=None,
+    font_style=FontStyle.REGULAR,
+    text_align=(TextAlign.CENTER, TextAlign.CENTER),
+    align=None,
+):
+    """Compound.make_text for text that doesn't follow a path"""
+    if text_align[0] not in _horizontal or text_align[1] not in _vertical:
+        raise ValueError(f"Unsupported text alignment {text_align}")
+    brep_font = _font(font, font_path, font_style, font_size)
+    formatter = Font_TextFormatter()
+    formatter.SetupAlignment(_horizontal[text_align[0]], _vertical[text_align[1]])
+    formatter.Append(NCollection_Utf8String(txt), brep_font.FTFont())
+    formatter.Format()
+
+    # Glyph corners are in font units
+    scale = brep_font.Scale()
+    glyphs = []
+    for i, char in enumerate(txt):
+        if char.isspace():
+            continue
+        glyph = _glyph(font, font_path, font_style, font_size, char)
+        if glyph is not None:
+            corner = formatter.BottomLeft(i)
+            glyphs.append((*glyph, Vector(corner.x() * scale, corner.y() * scale)))
+
+    offset = Vector()
+    if align is not None and glyphs:
+        # Bounding the whole text is slow, combine the cached glyph boxes
+        low = zip(*((bbox.min + position).to_tuple() for _, bbox, position in glyphs))
+        high = zip(*((bbox.max + position).to_tuple() for _, bbox, position in glyphs))
+        offset = to_align_offset(
+            [min(c) for c in low], [max(c) for c in high], tuplify(align, 2)
+        )
+    return Compound(
+        [faces.moved(Location(position + offset)) for faces, _, position in glyphs]
+    )
+
+
+class Text(build123d.Text):
+    """build123d's Text, built from cached glyphs unless it follows a path"""
+
+    def __init__(
+        self,
+        txt,
+        font_size,
+        font="Arial",
+        font_path=None,
+        font_style=FontStyle.REGULAR,
+        text_align=(TextAlign.CENTER, TextAlign.CENTER),
+        align=None,
+        path=None,
+        position_on_path=0.0,
+        rotation=0.0,
+        mode=Mode.ADD,
+    ):
+        if path is not None:
+            super().__init__(
+                txt,
+                font_size,
+                font,
+                font_path,
+                font_style,
+                text_align,
+                align,
+                path,
+                position_on_path,
+                rotation,
+                mode,
+            )
+            return
+
+        context = BuildSketch._get_context(self)
+        validate_inputs(context, self)
+
+        self.txt = txt
+        self.font_size = font_size
+        self.font = font
+        self.font_path = font_path
+        self.font_style = font_style
+        self.text_align = text_align
+        self.align = align
+        self.text_path = path
+        self.position_on_path = position_on_path
+        self.rotation = rotation
+        self.mode = mode
+
+        text = make_text(txt, font_size, font, font_path, font_style, text_align, align)
+        BaseSketchObject.__init__(self, text, rotation, None, mode)
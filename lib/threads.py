@@ -0,0 +1,47 @@
+"""Cached bd_warehouse threads
+
+Sweeping thread profiles is among the slowest things parts do, and the same
+threads get built again on every export. cached_thread builds them through
+lib.memo, keyed by every parameter of the thread class with the defaults
+filled in, so each distinct thread is only ever built once.
+"""
+
+from inspect import signature
+
+from build123d import Mode
+
+from lib import preview
+from lib.memo import memoize
+
+
+@memoize
+def _build(cls, params):
+    # Never added to a builder that happens to be active, so cache hits and
+    # misses behave the same
+    return cls(**dict(params), mode=Mode.PRIVATE)
+
+
+def cached_thread(cls, location=None, **params):
+    """cls(**params), e.g. an IsoThread, loaded from the cache when possible
+
+    The thread is placed at location if given. Unlike constructing it directly
+    it's never added to an active builder, add() it where it's needed. In
+    previews it's a cheap stand-in instead.
+    """
+    if preview.enabled():
+        thread = preview.thread(cls, **params, mode=Mode.PRIVATE)
+        if location is not None:
+            thread.move(location)
+        return thread
+    bound = signature(cls).bind(**params)
+    bound.apply_defaults()
+    key = []
+    for name, value in sorted(bound.arguments.items()):
+        if name == "mode":
+            continue
+        # end_finishes given as a list or a tuple make the same thread
+        key.append((name, tuple(value) if isinstance(value, list) else value))
+    thread = _build(cls, tuple(key))
+    if location is not None:
+        thread.move(location)
+    return thread
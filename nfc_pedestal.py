@@ -43,6 +43,8 @@ import copy
 
 from build123d import *
 
+from lib.preview import fillet
+
 from vitamins import dlp_rfid2
 from vitamins import adafruit_4090_usb_c_breakout as usb_breakout
 from vitamins import nut_m2_5_square as nut
@@ -176,12 +178,7 @@ with BuildPart() as base_top:
 
     with BuildSketch() as usb_mount_hole_sketch:
         with Locations(usb_breakout_zero):
-            with Locations(
-                *(
-                    (-c.Y, -c.X)
-                    for c in (h.arc_center for h in usb_breakout.mount_holes)
-                )
-            ):
+            with Locations(*((-c.Y, -c.X) for c in usb_breakout.mount_hole_centers)):
                 Circle(usb_breakout.mount_hole_rad - pcb_xy_tol / 2)
     extrude(usb_mount_hole_sketch.sketch, amount=-usb_breakout.nom_pcb_thickness)
 
@@ -303,12 +300,12 @@ with BuildPart() as base_mid:
         )
 
         with Locations(usb_breakout_zero):
-            cc_bbox = usb_breakout.resistor_bbox
-            cc_center = cc_bbox.center()
+            cc_center = usb_breakout.resistor_center
+            cc_size = usb_breakout.resistor_size
             with Locations((-cc_center.Y, -cc_center.X)):
                 Rectangle(
-                    cc_bbox.size.Y + usb_cc_tol,
-                    cc_bbox.size.X + usb_cc_tol,
+                    cc_size.Y + usb_cc_tol,
+                    cc_size.X + usb_cc_tol,
                     mode=Mode.SUBTRACT,
                 )
 
@@ -3,6 +3,8 @@
 import logging
 from build123d import *
 
+from lib.preview import chamfer
+
 from pcie_bracket import (
     bracket,
     main_length,
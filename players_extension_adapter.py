@@ -38,6 +38,8 @@ import numpy as np
 from build123d import *
 from bd_warehouse.thread import IsoThread
 
+from lib.threads import cached_thread
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
@@ -59,7 +61,8 @@ cut_horz_buffer = 1.5
 
 # No idea if the thread is actually ISO, but this reduces the design space
 # significantly which is convenient
-_inner_thread = IsoThread(
+_inner_thread = cached_thread(
+    IsoThread,
     major_diameter=16.1,
     pitch=11.7 / 8,
     length=thread_len,
@@ -2,6 +2,8 @@
 
 from build123d import *
 
+from lib.preview import fillet, chamfer
+
 
 def build_trainer(
     ball_dia: float,
@@ -2,6 +2,8 @@
 
 from build123d import *
 
+from lib.preview import chamfer
+
 # 6700RS
 bearing_outer_dia = 15
 bearing_inner_dia = 10
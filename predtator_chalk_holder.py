@@ -5,6 +5,9 @@ from bd_warehouse.thread import Thread
 
 from math import sin, cos, radians, tan
 
+from lib.preview import chamfer
+from lib.threads import cached_thread
+
 
 outer_dia = 37
 thread_min_dia = 28.5
@@ -52,7 +55,8 @@ l = keyring_center_dist + l1 + l2
 h = l / tan(radians(theta))
 keyring_pts = [(0, h), (l, 0), (0, -h)]
 
-_lower_thread = Thread(
+_lower_thread = cached_thread(
+    Thread,
     apex_radius=thread_maj_dia / 2 - thread_tol,
     apex_width=thread_tip_width,
     root_radius=thread_min_dia / 2 - thread_tol,
@@ -61,7 +65,9 @@ _lower_thread = Thread(
     length=thread_depth,
     end_finishes=("fade", "fade"),
 )
-_upper_thread = Rotation(0, 0, thread_compliment_rotation) * Thread(
+_upper_thread = cached_thread(
+    Thread,
+    location=Rotation(0, 0, thread_compliment_rotation),
     apex_radius=thread_min_dia / 2 + thread_tol,
     apex_width=thread_tip_width,
     root_radius=thread_maj_dia / 2 + thread_tol,
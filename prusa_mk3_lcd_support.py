@@ -6,6 +6,8 @@ https://github.com/prusa3d/Original-Prusa-i3/blob/MK3S/Printed-Parts/SCAD/lcd-su
 
 from build123d import *
 
+from lib.preview import Text
+
 
 def cube(lwh):
     """Approximation of OpenSCAD cube()"""
@@ -2,7 +2,11 @@
 
 from build123d import *
 
+from lib.memo import memoize
+from lib.preview import fillet
 
+
+@memoize
 def build(
     inner_dia,
     planar_thickness,
@@ -26,23 +30,23 @@ def build(
         p = extrude(amount=planar_thickness)
         mirror(p)
         fillet(part.edges().filter_by(Axis.Z), fillet_radius)
-    return part
+    return part.part
 
 
 results = {
-    "lian_li_power_button": build(20, 2, 1.5).part,
-    "lian_li_custom_reset_collar": build(7.8, 1, 0.8).part,
-    "lian_li_custom_reset_pusher": build(3.3, 1, 0.8).part,
+    "lian_li_power_button": lambda: build(20, 2, 1.5),
+    "lian_li_custom_reset_collar": lambda: build(7.8, 1, 0.8),
+    "lian_li_custom_reset_pusher": lambda: build(3.3, 1, 0.8),
 }
 
 if __name__ == "__main__":
     if "show_object" in locals():
-        show_object(results["lian_li_power_button"])
+        show_object(results["lian_li_power_button"]())
 
     try:
         from ocp_vscode import *
 
-        for name, part in results.items():
-            show_object(part, name=name)
+        for name, build_part in results.items():
+            show_object(build_part(), name=name)
     except:
         pass
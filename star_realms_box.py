@@ -6,6 +6,9 @@ Fits the Frontiers set and one base set
 from build123d import *
 from math import sin, tan, radians
 
+from lib.preview import chamfer
+from lib.step_cache import import_step
+
 _first_layer_height = 0.2
 
 card_tol = 0.1
@@ -2,6 +2,8 @@
 
 from build123d import *
 
+from lib.preview import Text
+
 
 pcb_thickness = 1.6
 pcb_length = 50
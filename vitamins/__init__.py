@@ -0,0 +1,33 @@
+"""Purchased parts and reusable part generators
+
+Heavy geometry like default instances is exposed through lazy module
+attributes, so importing a vitamin only to call its builders or read its
+dimensions doesn't also build them.
+"""
+
+import sys
+
+
+def lazy(module_name, **builders):
+    """PEP 562 module __getattr__ building each attribute on first access
+
+    Each builder is called without arguments the first time its attribute is
+    accessed and the result is stored on the module, so later accesses are
+    plain lookups. Vitamins built from a STEP model use it so the model itself
+    is only imported once something other than its dimensions is used. Use as
+    `__getattr__ = lazy(__name__, default=build)` after everything the builders
+    need is defined.
+    """
+
+    def __getattr__(name):
+        if name not in builders:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = builders[name]()
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    if module_name == "__main__":
+        # Run directly, e.g. to show it, so build everything for show_all()
+        for name in builders:
+            __getattr__(name)
+    return __getattr__
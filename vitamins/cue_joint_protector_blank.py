@@ -1,9 +1,32 @@
-from math import tan, radians
+from math import atan, cos, degrees, pi, tan, radians
 from build123d import *
 
+from lib import preview
+from lib.preview import chamfer
+
+from vitamins import lazy
+
 ALIGN = (Align.CENTER, Align.CENTER, Align.MIN)
 
 
+def _tapered_prism(bottom_radius, top_radius, side_count, height):
+    """The loft between regular polygons of these major radii, with planar faces
+
+    Booleans against the B-spline faces of a loft are slow, previews intersect
+    with this instead. It overhangs both ends so its caps don't touch the part's.
+    """
+    slope = (bottom_radius - top_radius) / height
+    overhang = 1
+    with BuildPart() as prism:
+        with BuildSketch(Plane.XY.offset(-overhang)):
+            RegularPolygon(bottom_radius + slope * overhang, side_count)
+        extrude(
+            amount=height + 2 * overhang,
+            taper=degrees(atan(slope * cos(pi / side_count))),
+        )
+    return prism.part
+
+
 class CueJointProtectorBlank(BasePartObject):
     def __init__(
         self,
@@ -41,57 +64,77 @@ class CueJointProtectorBlank(BasePartObject):
             bot_face = faces().sort_by(Axis.Z)[0]
 
             # Cut flat sides
-            with BuildSketch(top_face) as loft_top:
-                RegularPolygon(
-                    side_count=num_faces,
-                    radius=outer_dia / 2,
-                    major_radius=True,
+            if preview.enabled():
+                flats = _tapered_prism(
+                    outer_dia / 2 / cos(pi / num_faces),
+                    outer_dia / 2,
+                    num_faces,
+                    total_length,
                 )
-            with BuildSketch(bot_face) as loft_bot:
-                RegularPolygon(
-                    side_count=num_faces,
-                    radius=outer_dia / 2,
-                    major_radius=False,
-                )
-            loft(sections=[loft_top.sketch, loft_bot.sketch], mode=Mode.INTERSECT)
+                add(flats, mode=Mode.INTERSECT)
+            else:
+                with BuildSketch(top_face) as loft_top:
+                    RegularPolygon(
+                        side_count=num_faces,
+                        radius=outer_dia / 2,
+                        major_radius=True,
+                    )
+                with BuildSketch(bot_face) as loft_bot:
+                    RegularPolygon(
+                        side_count=num_faces,
+                        radius=outer_dia / 2,
+                        major_radius=False,
+                    )
+                loft(sections=[loft_top.sketch, loft_bot.sketch], mode=Mode.INTERSECT)
 
             # Cut primary top chamfer
-            with BuildSketch(top_face) as chamfer_loft_top:
-                RegularPolygon(
-                    side_count=num_faces,
-                    radius=self.top_chamfer_loft_top_dia / 2,
-                    major_radius=True,
+            if preview.enabled():
+                top_chamfer = _tapered_prism(
+                    self.top_chamfer_loft_bot_dia / 2,
+                    self.top_chamfer_loft_top_dia / 2,
+                    num_faces,
+                    total_length,
                 )
-            with BuildSketch(bot_face) as chamfer_loft_bot:
-                RegularPolygon(
-                    side_count=num_faces,
-                    radius=self.top_chamfer_loft_bot_dia / 2,
-                    major_radius=True,
+                add(top_chamfer, mode=Mode.INTERSECT)
+            else:
+                with BuildSketch(top_face) as chamfer_loft_top:
+                    RegularPolygon(
+                        side_count=num_faces,
+                        radius=self.top_chamfer_loft_top_dia / 2,
+                        major_radius=True,
+                    )
+                with BuildSketch(bot_face) as chamfer_loft_bot:
+                    RegularPolygon(
+                        side_count=num_faces,
+                        radius=self.top_chamfer_loft_bot_dia / 2,
+                        major_radius=True,
+                    )
+                loft(
+                    sections=[chamfer_loft_top.sketch, chamfer_loft_bot.sketch],
+                    mode=Mode.INTERSECT,
                 )
-            loft(
-                sections=[chamfer_loft_top.sketch, chamfer_loft_bot.sketch],
-                mode=Mode.INTERSECT,
-            )
 
             # Cut secondary chamfer
             top_face = faces().sort_by(Axis.Z)[-1]
             chamfer(top_face.edges(), length=top_secondary_chamfer_len)
 
-            # Grip notches
-            with BuildSketch(Plane.XZ) as notch_sketch:
-                point = Vector(outer_dia / 2, top_face.center().Z - notch_start)
-                with Locations(point):
-                    with GridLocations(
-                        x_spacing=0,
-                        y_spacing=-notch_offset,
-                        x_count=1,
-                        y_count=notch_count,
-                        align=Align.MIN,
-                    ):
-                        Rectangle(
-                            width=notch_depth, height=notch_height, align=Align.MAX
-                        )
-            revolve(axis=Axis.Z, mode=Mode.SUBTRACT)
+            # Grip notches, cutting them around the flat sides is the slowest
+            # step and they're small enough for previews to skip
+            if not preview.enabled() or notch_depth > preview.small_feature:
+                with BuildSketch(Plane.XZ) as notch_sketch:
+                    point = Vector(outer_dia / 2, top_face.center().Z - notch_start)
+                    with Locations(point):
+                        with GridLocations(
+                            x_spacing=0,
+                            y_spacing=-notch_offset,
+                            x_count=1,
+                            y_count=notch_count,
+                            align=Align.MIN,
+                        ):
+                            Rectangle(
+                                width=notch_depth, height=notch_height, align=Align.MAX
+                            )
+                revolve(axis=Axis.Z, mode=Mode.SUBTRACT)
 
             # Protection ring
             with BuildSketch(Plane.YZ) as protection_ring_sketch:
@@ -140,9 +183,9 @@ class CueJointProtectorBlank(BasePartObject):
         return self.outer_dia + self.protection_ring_thickness * 2
 
 
-default = CueJointProtectorBlank(
-    total_length=42.95,
-    outer_dia=21.5,
+__getattr__ = lazy(
+    __name__,
+    default=lambda: CueJointProtectorBlank(total_length=42.95, outer_dia=21.5),
 )
 
 if __name__ == "__main__":
@@ -10,7 +10,9 @@ from bd_warehouse.thread import (
     TrapezoidalThread,
 )
 
+from lib.memo import memoize
 from vitamins.cue_joint_protector_blank import CueJointProtectorBlank, ALIGN
+from vitamins import lazy
 
 THREAD_CLASSES = (
     Thread,
@@ -61,6 +63,7 @@ def get_section_height(section) -> float:
         )
 
 
+@memoize
 def build(
     thread_sections: list[BasePartObject] = [],
     **kwargs,
@@ -98,8 +101,13 @@ def build(
     return female
 
 
-default = build(
-    total_length=42.95, outer_dia=21.5, thread_sections=[Cylinder(3, 10, align=ALIGN)]
+__getattr__ = lazy(
+    __name__,
+    default=lambda: build(
+        total_length=42.95,
+        outer_dia=21.5,
+        thread_sections=[Cylinder(3, 10, align=ALIGN)],
+    ),
 )
 
 if __name__ == "__main__":
@@ -1,19 +1,24 @@
 import copy
+import sys
 from math import tan, radians
 
 from build123d import *
 
 from vitamins import screw_socket_m2_5_40 as screw
 from vitamins import nut_m2_5_square as nut
+from vitamins import lazy
 from vitamins.cue_joint_protector_female import (
     get_section_height,
     get_section_dia,
     THREAD_CLASSES,
 )
 
+from lib import preview
+from lib.memo import memoize
 from vitamins.cue_joint_protector_blank import CueJointProtectorBlank, ALIGN
 
 
+@memoize
 def build(
     stem_dia: float,
     stem_extra_len: float = 0,
@@ -69,14 +74,16 @@ def build(
             Circle(screw.head_radius + screw_rad_tol, mode=Mode.SUBTRACT)
         extrude(amount=screw.head_height + screw_head_extra)
 
-        tip_face = faces().filter_by(Axis.Z).sort_by(Axis.Z)[-1]
-        tip_edge = (
-            tip_face.edges()
-            .filter_by(GeomType.CIRCLE)
-            .sort_by(lambda x: x.radius, reverse=True)[0]
-        )
-        tip_fillet = _male.part.max_fillet([tip_edge], max_iterations=100)
-        fillet(objects=tip_edge, radius=tip_fillet)
+        # Searching for the largest fillet that fits is slow, previews skip it
+        if not preview.enabled():
+            tip_face = faces().filter_by(Axis.Z).sort_by(Axis.Z)[-1]
+            tip_edge = (
+                tip_face.edges()
+                .filter_by(GeomType.CIRCLE)
+                .sort_by(lambda x: x.radius, reverse=True)[0]
+            )
+            tip_fillet = _male.part.max_fillet([tip_edge], max_iterations=100)
+            fillet(objects=tip_edge, radius=tip_fillet)
 
         with BuildSketch(screw_head_face) as shank_sketch:
             Circle(screw.shank_radius)
@@ -108,17 +115,30 @@ def build(
     return male
 
 
-default = build(
-    stem_dia=4,
-    stem_extra_len=10,
-    total_length=42.95,
-    outer_dia=21.5,
-    thread_sections=[Cylinder(3, 10, align=ALIGN)],
+def _build_default():
+    return build(
+        stem_dia=4,
+        stem_extra_len=10,
+        total_length=42.95,
+        outer_dia=21.5,
+        thread_sections=[Cylinder(3, 10, align=ALIGN)],
+    )
+
+
+def _connected(vitamin, joint, vitamin_joint):
+    """A copy of vitamin placed at joint of the default protector"""
+    part = copy.copy(vitamin.out)
+    default = sys.modules[__name__].default
+    default.joints[joint].connect_to(part.joints[vitamin_joint])
+    return part
+
+
+__getattr__ = lazy(
+    __name__,
+    default=_build_default,
+    _nut=lambda: _connected(nut, "nut", "bottom"),
+    _screw=lambda: _connected(screw, "screw", "head_bottom"),
 )
-_nut = copy.copy(nut.out)
-_screw = copy.copy(screw.out)
-default.joints["nut"].connect_to(_nut.joints["bottom"])
-default.joints["screw"].connect_to(_screw.joints["head_bottom"])
 
 if __name__ == "__main__":
     try:
@@ -1,6 +1,9 @@
 from math import tan, radians
 from build123d import *
 
+from lib.memo import memoize
+from vitamins import lazy
+
 # hinge_dia=10
 # hinge_width=50
 # hinge_internal_sections=3
@@ -12,6 +15,7 @@ from build123d import *
 # hinge_join_gap=0.5
 
 
+@memoize
 def build(
     hinge_dia=10,
     hinge_width=50,
@@ -151,12 +155,12 @@ def build(
     return {
         "parent": hinge_parent,
         "child": hinge_child,
-        "parent_cutout": gap_cutout_parent,
-        "child_cutout": gap_cutout_child,
+        "parent_cutout": gap_cutout_parent.part,
+        "child_cutout": gap_cutout_child.part,
     }
 
 
-default = build()
+__getattr__ = lazy(__name__, default=build)
 
 if __name__ == "__main__":
     try:
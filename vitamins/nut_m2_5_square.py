@@ -1,34 +1,54 @@
+from functools import cache
 from pathlib import Path
 
 from build123d import *
 
-## McMaster model has origin at center of all axes, aligned to Y axis
-_nut = import_step(
+from lib.memo import memoize
+from lib.step_cache import import_step, measurements
+from vitamins import lazy
+
+_step = (
     Path(__file__).parent.parent
     / "res/97258A122_18-8_Stainless_Steel_Thin_Square_Nut.step"
 )
-# Rotate to align with Z axis
-_nut = _nut.rotate(Axis.X, -90)
 
-_nut_side_face = (
-    _nut.faces().filter_by(GeomType.PLANE).filter_by(Axis.X).sort_by(Axis.X)[0]
-)
-nut_width = abs(_nut_side_face.center().X) * 2
-# Move to align bottom face with Z=0
-_nut_bottom_face = _nut.faces().filter_by(GeomType.PLANE).sort_by(Axis.Z)[0]
-nut_thickness = abs(_nut_bottom_face.center().Z) * 2
-_nut.move(Location(-_nut_bottom_face.center()))
 
-hole_edge = _nut.edges().filter_by(GeomType.CIRCLE).sort_by_distance((0, 0, 0))[0]
-hole_dia = hole_edge.radius * 2
+@cache
+def _load():
+    """The nut standing on the XY plane and its dimensions"""
+    ## McMaster model has origin at center of all axes, aligned to Y axis
+    nut = import_step(_step)
+    # Rotate to align with Z axis
+    nut = nut.rotate(Axis.X, -90)
 
-out = _nut
+    side_face = (
+        nut.faces().filter_by(GeomType.PLANE).filter_by(Axis.X).sort_by(Axis.X)[0]
+    )
+    # Move to align bottom face with Z=0
+    bottom_face = nut.faces().filter_by(GeomType.PLANE).sort_by(Axis.Z)[0]
+    dimensions = {
+        "nut_width": abs(side_face.center().X) * 2,
+        "nut_thickness": abs(bottom_face.center().Z) * 2,
+    }
+    nut.move(Location(-bottom_face.center()))
 
-bottom_joint = RigidJoint(
-    label="bottom", joint_location=Location((0, 0, 0)), to_part=out
-)
+    hole_edge = nut.edges().filter_by(GeomType.CIRCLE).sort_by_distance((0, 0, 0))[0]
+    dimensions["hole_dia"] = hole_edge.radius * 2
+
+    bottom_joint = RigidJoint(
+        label="bottom", joint_location=Location((0, 0, 0)), to_part=nut
+    )
+    geometry = {"out": nut, "hole_edge": hole_edge, "bottom_joint": bottom_joint}
+    return geometry, dimensions
 
 
+_dimensions = measurements(_step, __file__, lambda: _load()[1])
+nut_width = _dimensions["nut_width"]
+nut_thickness = _dimensions["nut_thickness"]
+hole_dia = _dimensions["hole_dia"]
+
+
+@memoize
 def build_cutout(
     width_tol=0.2,
     thickness_tol=0.2,
@@ -52,7 +72,13 @@ def build_cutout(
     return nut_cutout.part
 
 
-_cutout = build_cutout()
+__getattr__ = lazy(
+    __name__,
+    out=lambda: _load()[0]["out"],
+    hole_edge=lambda: _load()[0]["hole_edge"],
+    bottom_joint=lambda: _load()[0]["bottom_joint"],
+    _cutout=build_cutout,
+)
 
 if __name__ == "__main__":
     try:
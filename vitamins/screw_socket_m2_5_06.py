@@ -1,47 +1,75 @@
+from functools import cache
 from pathlib import Path
 
 from build123d import *
 
-# McMaster model has origin at center of all axes, head is at positive Z.
-# Reorient to have the mating side of the head at origin facing positive Z.
-_screw = import_step(
+from lib.step_cache import import_step, measurements
+from vitamins import lazy
+
+_step = (
     Path(__file__).parent.parent
     / "res/91292A010_18-8_Stainless_Steel_Socket_Head_Screw.step"
 )
-_cyl_faces = (
-    _screw.faces()
-    .filter_by(GeomType.CYLINDER)
-    .sort_by(lambda x: x.radius, reverse=True)
-)
-_head_side_face = _cyl_faces[0]
-
-_head_top_face = _screw.faces().filter_by(GeomType.PLANE).sort_by(Axis.Z)[-1]
-# Somewhat of a hack but good enough
-# Top and bottom faces aren't quite exactly the same area but really close
-_head_bot_face = (
-    _screw.faces()
-    .filter_by(GeomType.PLANE)
-    .sort_by(lambda f: abs(f.area - _head_top_face.area))
-)[1]
-
-head_radius = _head_side_face.radius
-head_height = abs(_head_top_face.center().Z - _head_bot_face.center().Z)
-# Have to skip 2 faces since the head is comprised of 2 half cylindrical faces
-_thread = _cyl_faces[2]
-thread_radius = _thread.radius
-_base_pos = _head_bot_face.center()
-# Move mating face to origin
-_screw.move(Location(-_base_pos))
-# Rotate screw to point up. Why is there move/moved but not rotate/rotated?
-_screw = _screw.rotate(Axis.X, 180)
-_screw_tip_pos = _screw.faces().filter_by(GeomType.PLANE).sort_by(Axis.Z)[-1].center().Z
-
-out = _screw
-
-head_bottom_joint = RigidJoint(
-    label="head_bottom", joint_location=Location((0, 0, 0)), to_part=out
+
+
+@cache
+def _load():
+    """The screw pointing up from the mating side of its head and its dimensions"""
+    # McMaster model has origin at center of all axes, head is at positive Z.
+    # Reorient to have the mating side of the head at origin facing positive Z.
+    screw = import_step(_step)
+    cyl_faces = (
+        screw.faces()
+        .filter_by(GeomType.CYLINDER)
+        .sort_by(lambda x: x.radius, reverse=True)
+    )
+    head_side_face = cyl_faces[0]
+
+    head_top_face = screw.faces().filter_by(GeomType.PLANE).sort_by(Axis.Z)[-1]
+    # Somewhat of a hack but good enough
+    # Top and bottom faces aren't quite exactly the same area but really close
+    head_bot_face = (
+        screw.faces()
+        .filter_by(GeomType.PLANE)
+        .sort_by(lambda f: abs(f.area - head_top_face.area))
+    )[1]
+
+    # Have to skip 2 faces since the head is comprised of 2 half cylindrical faces
+    thread = cyl_faces[2]
+    dimensions = {
+        "head_radius": head_side_face.radius,
+        "head_height": abs(head_top_face.center().Z - head_bot_face.center().Z),
+        "thread_radius": thread.radius,
+    }
+    base_pos = head_bot_face.center()
+    # Move mating face to origin
+    screw.move(Location(-base_pos))
+    # Rotate screw to point up. Why is there move/moved but not rotate/rotated?
+    screw = screw.rotate(Axis.X, 180)
+    dimensions["screw_tip_pos"] = (
+        screw.faces().filter_by(GeomType.PLANE).sort_by(Axis.Z)[-1].center().Z
+    )
+
+    head_bottom_joint = RigidJoint(
+        label="head_bottom", joint_location=Location((0, 0, 0)), to_part=screw
+    )
+    return {"out": screw, "head_bottom_joint": head_bottom_joint}, dimensions
+
+
+_dimensions = measurements(_step, __file__, lambda: _load()[1])
+head_radius = _dimensions["head_radius"]
+head_height = _dimensions["head_height"]
+thread_radius = _dimensions["thread_radius"]
+_screw_tip_pos = _dimensions["screw_tip_pos"]
+
+
+__getattr__ = lazy(
+    __name__,
+    out=lambda: _load()[0]["out"],
+    head_bottom_joint=lambda: _load()[0]["head_bottom_joint"],
 )
 
+
 if __name__ == "__main__":
     try:
         from ocp_vscode import *
@@ -1,31 +1,57 @@
+from functools import cache
 from pathlib import Path
 
 from build123d import *
 
-## McMaster model has origin at center of all axes, aligned to Z axis
-_washer = import_step(
+from lib.step_cache import import_step, measurements
+from vitamins import lazy
+
+_step = (
     Path(__file__).parent.parent
     / "res/91100A160_Zinc-Plated_Steel_Oversized_Washer.step"
 )
-# Move to align bottom face with Z=0
-_washer_bottom_face = _washer.faces().filter_by(GeomType.PLANE).sort_by(Axis.Z)[0]
-thickness = abs(_washer_bottom_face.center().Z) * 2
-_washer.move(Location(-_washer_bottom_face.center()))
 
-_washer_round_faces = (
-    _washer.faces().filter_by(GeomType.CYLINDER).sort_by(lambda x: x.radius)
-)
-_washer_outer_face = _washer_round_faces[-1]
-_washer_inner_face = _washer_round_faces[0]
-outer_dia = _washer_outer_face.radius * 2
-inner_dia = _washer_inner_face.radius * 2
 
-out = _washer
+@cache
+def _load():
+    """The washer lying on the XY plane and its dimensions"""
+    ## McMaster model has origin at center of all axes, aligned to Z axis
+    washer = import_step(_step)
+    # Move to align bottom face with Z=0
+    bottom_face = washer.faces().filter_by(GeomType.PLANE).sort_by(Axis.Z)[0]
+    thickness = abs(bottom_face.center().Z) * 2
+    washer.move(Location(-bottom_face.center()))
+
+    round_faces = (
+        washer.faces().filter_by(GeomType.CYLINDER).sort_by(lambda x: x.radius)
+    )
+    outer_face = round_faces[-1]
+    inner_face = round_faces[0]
+    dimensions = {
+        "thickness": thickness,
+        "outer_dia": outer_face.radius * 2,
+        "inner_dia": inner_face.radius * 2,
+    }
+
+    bottom_joint = RigidJoint(
+        label="bottom", joint_location=Location((0, 0, 0)), to_part=washer
+    )
+    return {"out": washer, "bottom_joint": bottom_joint}, dimensions
 
-bottom_joint = RigidJoint(
-    label="bottom", joint_location=Location((0, 0, 0)), to_part=out
+
+_dimensions = measurements(_step, __file__, lambda: _load()[1])
+thickness = _dimensions["thickness"]
+outer_dia = _dimensions["outer_dia"]
+inner_dia = _dimensions["inner_dia"]
+
+
+__getattr__ = lazy(
+    __name__,
+    out=lambda: _load()[0]["out"],
+    bottom_joint=lambda: _load()[0]["bottom_joint"],
 )
 
+
 if __name__ == "__main__":
     try:
         from ocp_vscode import *